@@ -0,0 +1,337 @@
+"""
+End-to-end latency and throughput benchmark for the lume-epics server over
+Channel Access and pvAccess, run on loopback.
+
+For each protocol and synthetic model, a Server is started in a separate process
+and inputs are put through a lume_epics.client.controller.Controller. The first
+output of the model is monitored directly over the protocol to time each put until
+the matching output update arrives.
+
+Reported per case:
+    - put to output monitor latency percentiles, one put at a time
+    - sustained puts per second and output updates per second, putting as fast
+      as possible for a fixed duration
+    - CPU time and peak RSS of the server process tree (requires psutil)
+
+Reports record the lume-epics and lume-model versions measured, so figures can be
+traced to the variables and server they were taken against.
+
+Usage:
+    python -m benchmarks.end_to_end --protocols ca pva \\
+        --models scalar scalars:100 image:64 image:2048 --output results.json
+
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import threading
+import time
+
+import numpy as np
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# loopback configuration, may be overridden from the environment
+for key, value in {
+    "EPICS_CA_ADDR_LIST": "127.0.0.1",
+    "EPICS_CA_AUTO_ADDR_LIST": "NO",
+    "EPICS_CA_MAX_ARRAY_BYTES": str(2 ** 28),
+    "EPICS_CAS_INTF_ADDR_LIST": "127.0.0.1",
+    "EPICS_PVA_ADDR_LIST": "127.0.0.1",
+    "EPICS_PVA_AUTO_ADDR_LIST": "NO",
+    "EPICS_PVAS_INTF_ADDR_LIST": "127.0.0.1",
+}.items():
+    os.environ.setdefault(key, value)
+
+from epicscorelibs.path import get_lib
+
+os.environ.setdefault("PYEPICS_LIBCA", get_lib("ca"))
+
+import epics
+from p4p.client.thread import Context
+
+import lume_epics
+import lume_model
+from lume_epics.client.controller import Controller
+from lume_epics.epics_server import Server
+from benchmarks.models import model_from_spec
+
+
+def run_server(model_class, model_kwargs, prefix, protocols, server_kwargs,
+               ready_event, stop_event):
+    """Target of the server process."""
+    server = Server(
+        model_class,
+        prefix,
+        protocols=protocols,
+        model_kwargs=model_kwargs,
+        **server_kwargs,
+    )
+    server.start(monitor=False)
+    ready_event.set()
+    stop_event.wait()
+    server.stop()
+
+
+class ResourceMonitor:
+    """
+    Samples CPU time and RSS of a process and its children.
+
+    """
+
+    def __init__(self, pid: int, period: float = 0.2):
+        self._process = psutil.Process(pid) if psutil else None
+        self._period = period
+        self._stop = threading.Event()
+        self.peak_rss = 0
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _processes(self):
+        try:
+            return [self._process] + self._process.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return []
+
+    def cpu_time(self) -> float:
+        total = 0.0
+        for process in self._processes():
+            try:
+                times = process.cpu_times()
+                total += times.user + times.system
+            except psutil.NoSuchProcess:
+                continue
+
+        return total
+
+    def _sample(self):
+        while not self._stop.wait(self._period):
+            rss = 0
+            for process in self._processes():
+                try:
+                    rss += process.memory_info().rss
+                except psutil.NoSuchProcess:
+                    continue
+
+            self.peak_rss = max(self.peak_rss, rss)
+
+    def start(self):
+        if self._process is not None:
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+class OutputWatcher:
+    """
+    Monitors the first output of a benchmark model and records when a given value
+    arrives.
+
+    """
+
+    def __init__(self, protocol: str, pvname: str):
+        self.expected = None
+        self.received = threading.Event()
+        self.received_time = None
+        self.updates = 0
+        self._protocol = protocol
+
+        if protocol == "ca":
+            self._pv = epics.PV(pvname, callback=self._ca_callback, auto_monitor=True)
+
+        else:
+            self._context = Context("pva")
+            self._pv = self._context.monitor(pvname, self._pva_callback)
+
+    def _record(self, value):
+        now = time.perf_counter()
+        self.updates += 1
+        if value == self.expected:
+            self.received_time = now
+            self.received.set()
+
+    def _ca_callback(self, value=None, **kwargs):
+        self._record(float(np.ravel(value)[0]))
+
+    def _pva_callback(self, value):
+        self._record(float(np.ravel(value)[0]))
+
+    def expect(self, value: float):
+        self.expected = value
+        self.received.clear()
+
+    def close(self):
+        if self._protocol == "ca":
+            self._pv.clear_callbacks()
+            self._pv.disconnect()
+
+        else:
+            self._pv.close()
+            self._context.close()
+
+
+def benchmark_case(protocol: str, spec: str, prefix: str, n_puts: int,
+                   duration: float, timeout: float, server_kwargs: dict) -> dict:
+    """Benchmark a single protocol and model combination."""
+    model_class, model_kwargs = model_from_spec(spec)
+    model = model_class(**model_kwargs)
+
+    # spawn, as forking after the client has started EPICS threads is unsafe
+    context = multiprocessing.get_context("spawn")
+    ready_event = context.Event()
+    stop_event = context.Event()
+    server_process = context.Process(
+        target=run_server,
+        args=(model_class, model_kwargs, prefix, [protocol], server_kwargs,
+              ready_event, stop_event),
+    )
+    server_process.start()
+    ready_event.wait()
+
+    resources = ResourceMonitor(server_process.pid) if psutil else None
+
+    controller = Controller(
+        protocol, model.input_variables, model.output_variables, prefix
+    )
+    input_pv = f"{prefix}:input0"
+    if spec.startswith("image"):
+        output_pv = f"{prefix}:image"
+        if protocol == "ca":
+            output_pv += ":ArrayData_RBV"
+
+    else:
+        output_pv = f"{prefix}:output0"
+
+    watcher = OutputWatcher(protocol, output_pv)
+
+    # wait for the controller to connect before putting
+    start = time.monotonic()
+    while controller.get(input_pv) is None:
+        if time.monotonic() - start > timeout:
+            raise TimeoutError(f"Unable to connect to {input_pv}.")
+        time.sleep(0.05)
+
+    if resources is not None:
+        resources.start()
+        cpu_start = resources.cpu_time()
+
+    # latency, one put at a time
+    latencies = []
+    timeouts = 0
+    for i in range(1, n_puts + 1):
+        watcher.expect(float(i))
+        put_time = time.perf_counter()
+        controller.put(input_pv, float(i))
+
+        if watcher.received.wait(timeout):
+            latencies.append(watcher.received_time - put_time)
+
+        else:
+            timeouts += 1
+
+    # throughput, putting as fast as possible
+    updates_start = watcher.updates
+    puts = 0
+    value = float(n_puts)
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        value += 1
+        watcher.expect(value)
+        controller.put(input_pv, value)
+        puts += 1
+
+    put_elapsed = time.perf_counter() - start
+
+    # wait for the final put to be reflected
+    watcher.received.wait(timeout)
+    elapsed = time.perf_counter() - start
+    updates = watcher.updates - updates_start
+
+    result = {
+        "protocol": protocol,
+        "model": spec,
+        "puts": n_puts,
+        "timeouts": timeouts,
+        "throughput_puts": puts,
+        "puts_per_sec": puts / put_elapsed,
+        "output_updates_per_sec": updates / elapsed,
+    }
+
+    if latencies:
+        latencies = np.array(latencies) * 1000
+        result.update(
+            {
+                f"latency_ms_p{percentile}": float(np.percentile(latencies, percentile))
+                for percentile in [50, 90, 99]
+            }
+        )
+        result["latency_ms_max"] = float(latencies.max())
+
+    if resources is not None:
+        result["server_cpu_s"] = resources.cpu_time() - cpu_start
+        resources.stop()
+        result["server_peak_rss_mb"] = resources.peak_rss / 2 ** 20
+
+    watcher.close()
+    controller.close()
+    stop_event.set()
+    server_process.join()
+
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run lume-epics benchmarks.")
+    parser.add_argument("--protocols", nargs="+", default=["ca", "pva"])
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        default=["scalar", "scalars:100", "image:64", "image:512", "image:2048"],
+        help='Model specifications: "scalar", "scalars:<n>" or "image:<size>"',
+    )
+    parser.add_argument("--puts", type=int, default=200, help="Puts timed for latency")
+    parser.add_argument("--duration", type=float, default=5.0, help="Throughput duration in seconds")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Timeout in seconds")
+    parser.add_argument("--model-workers", type=int, default=None)
+    parser.add_argument("--image-transport", default="queue")
+    parser.add_argument("--threaded", action="store_true", help="Run protocol servers as threads")
+    parser.add_argument("--compact-messages", action="store_true", help="Encode queue messages compactly")
+    parser.add_argument("--output", default=None, help="JSON file for results")
+    args = parser.parse_args()
+
+    server_kwargs = {
+        "model_workers": args.model_workers,
+        "image_transport": args.image_transport,
+        "threaded": args.threaded,
+        "compact_messages": args.compact_messages,
+    }
+
+    results = []
+    for protocol in args.protocols:
+        for i, spec in enumerate(args.models):
+            prefix = f"bench{os.getpid()}{protocol}{i}"
+            result = benchmark_case(
+                protocol, spec, prefix, args.puts, args.duration, args.timeout,
+                server_kwargs,
+            )
+            print(json.dumps(result))
+            results.append(result)
+
+    report = {
+        "lume_epics_version": lume_epics.__version__,
+        "lume_model_version": lume_model.__version__,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "server_kwargs": server_kwargs,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,123 @@
+"""
+Synthetic models used by the lume-epics benchmarks. Each model copies the value of
+its first input to its outputs, so a client can match an output update to the put
+that caused it.
+
+"""
+import time
+
+import numpy as np
+from lume_model.variables import (
+    ScalarInputVariable,
+    ScalarOutputVariable,
+    ImageOutputVariable,
+)
+from lume_model.models import SurrogateModel
+
+
+class ScalarBenchmarkModel(SurrogateModel):
+    """
+    Model with n scalar inputs and n scalar outputs. Output i is set to input i.
+
+    """
+
+    def __init__(self, n_scalars: int = 1, evaluation_time: float = 0.0):
+        """
+        Args:
+            n_scalars (int): Number of scalar inputs and outputs.
+
+            evaluation_time (float): Time in seconds to sleep in each evaluation.
+
+        """
+        self.evaluation_time = evaluation_time
+        self.input_variables = {
+            f"input{i}": ScalarInputVariable(
+                name=f"input{i}", default=0.0, range=[-1e9, 1e9]
+            )
+            for i in range(n_scalars)
+        }
+        self.output_variables = {
+            f"output{i}": ScalarOutputVariable(name=f"output{i}")
+            for i in range(n_scalars)
+        }
+
+    def evaluate(self, input_variables):
+        input_variables = {variable.name: variable for variable in input_variables}
+
+        if self.evaluation_time:
+            time.sleep(self.evaluation_time)
+
+        for i in range(len(self.output_variables)):
+            self.output_variables[f"output{i}"].value = input_variables[
+                f"input{i}"
+            ].value
+
+        return list(self.output_variables.values())
+
+
+class ImageBenchmarkModel(SurrogateModel):
+    """
+    Model with one scalar input and a square image output filled with the input
+    value.
+
+    """
+
+    def __init__(self, image_size: int = 64, evaluation_time: float = 0.0):
+        """
+        Args:
+            image_size (int): Width and height of the output image.
+
+            evaluation_time (float): Time in seconds to sleep in each evaluation.
+
+        """
+        self.image_size = image_size
+        self.evaluation_time = evaluation_time
+        self.input_variables = {
+            "input0": ScalarInputVariable(name="input0", default=0.0, range=[-1e9, 1e9])
+        }
+        self.output_variables = {
+            "image": ImageOutputVariable(
+                name="image",
+                axis_labels=["x", "y"],
+                x_min=0,
+                x_max=1,
+                y_min=0,
+                y_max=1,
+            )
+        }
+
+    def evaluate(self, input_variables):
+        input_variables = {variable.name: variable for variable in input_variables}
+
+        if self.evaluation_time:
+            time.sleep(self.evaluation_time)
+
+        self.output_variables["image"].value = np.full(
+            (self.image_size, self.image_size), input_variables["input0"].value
+        )
+
+        return list(self.output_variables.values())
+
+
+def model_from_spec(spec: str) -> tuple:
+    """Build a model class and kwargs from a short specification.
+
+    Args:
+        spec (str): One of "scalar", "scalars:<n>" or "image:<size>".
+
+    Returns:
+        tuple: Model class and model kwargs.
+
+    """
+    name, _, size = spec.partition(":")
+
+    if name == "scalar":
+        return ScalarBenchmarkModel, {"n_scalars": 1}
+
+    elif name == "scalars":
+        return ScalarBenchmarkModel, {"n_scalars": int(size)}
+
+    elif name == "image":
+        return ImageBenchmarkModel, {"image_size": int(size)}
+
+    raise ValueError(f"Unknown benchmark model {spec}.")
@@ -0,0 +1,99 @@
+"""
+Measures the delay between an output message being queued by the comm thread and
+its consumption by a protocol server process, along with the CPU used by the
+consumer while the queue is idle.
+
+Compares the polling loop previously used by CAServer.run and PVAServer.run
+(get_nowait and a 10 ms sleep) with the blocking drain now used by both servers.
+
+Usage:
+    python -m benchmarks.out_queue_latency --messages 200 --interval 0.02
+
+"""
+import argparse
+import json
+import multiprocessing
+import time
+from queue import Empty
+
+import numpy as np
+
+from lume_epics.transport import WAKE_MESSAGE, drain_queue
+
+
+def polling_consumer(queue, exit_event, results):
+    """Consumer loop used before event-driven consumption."""
+    latencies = []
+    while not exit_event.is_set():
+        try:
+            message = queue.get_nowait()
+            if message is not WAKE_MESSAGE:
+                latencies.append(time.perf_counter() - message["time"])
+        except Empty:
+            time.sleep(0.01)
+
+    results.put({"latencies": latencies, "cpu": time.process_time()})
+
+
+def blocking_consumer(queue, exit_event, results):
+    """Consumer loop draining the queue with a blocking wait."""
+    latencies = []
+    while not exit_event.is_set():
+        try:
+            messages = drain_queue(queue, timeout=0.5)
+        except Empty:
+            continue
+
+        now = time.perf_counter()
+        for message in messages:
+            if message is not WAKE_MESSAGE:
+                latencies.append(now - message["time"])
+
+    results.put({"latencies": latencies, "cpu": time.process_time()})
+
+
+def measure(consumer, n_messages: int, interval: float, idle: float) -> dict:
+    queue = multiprocessing.Queue()
+    results = multiprocessing.Queue()
+    exit_event = multiprocessing.Event()
+    process = multiprocessing.Process(
+        target=consumer, args=(queue, exit_event, results)
+    )
+    process.start()
+    time.sleep(0.5)
+
+    for _ in range(n_messages):
+        queue.put({"time": time.perf_counter(), "output_variables": []})
+        time.sleep(interval)
+
+    # idle period used to compare CPU use with nothing to consume
+    time.sleep(idle)
+
+    exit_event.set()
+    queue.put(WAKE_MESSAGE)
+    result = results.get()
+    process.join()
+
+    latencies = np.array(result["latencies"]) * 1000
+    return {
+        "consumer": consumer.__name__,
+        "messages": len(latencies),
+        "latency_ms_p50": float(np.percentile(latencies, 50)),
+        "latency_ms_p99": float(np.percentile(latencies, 99)),
+        "latency_ms_max": float(latencies.max()),
+        "consumer_cpu_s": result["cpu"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure out queue latency.")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.02)
+    parser.add_argument("--idle", type=float, default=5.0)
+    args = parser.parse_args()
+
+    results = [
+        measure(consumer, args.messages, args.interval, args.idle)
+        for consumer in [polling_consumer, blocking_consumer]
+    ]
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,117 @@
+"""
+Measures the serialization and queue overhead of output messages passed from the
+server comm thread to the protocol processes, comparing pickled lume-model
+variables against the compact encoding of lume_epics.transport.VariableCodec.
+
+Reported per model:
+    - pickled message size in bytes
+    - pickle dumps and loads time, including encoding and decoding for the compact
+      messages
+    - round trip time through a multiprocessing.Queue to a child process and back
+
+Results only describe the real queue traffic when measured against the pydantic
+variables of lume-model, so each result records the lume-model version used.
+
+Usage:
+    python -m benchmarks.wire_messages --models scalar scalars:100 image:512
+
+"""
+import argparse
+import json
+import multiprocessing
+import pickle
+import time
+
+import numpy as np
+import lume_model
+
+from lume_epics.transport import VariableCodec
+from benchmarks.models import model_from_spec
+
+
+def echo(in_queue, out_queue):
+    """Target of the child process, returns every message received."""
+    while True:
+        message = in_queue.get()
+        if message is None:
+            break
+
+        out_queue.put(message)
+
+
+def time_call(function, repeat: int) -> float:
+    """Returns the median time of a call in microseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return float(np.median(times)) * 1e6
+
+
+def measure(spec: str, repeat: int) -> dict:
+    """Measure legacy and compact messages for a benchmark model."""
+    model_class, model_kwargs = model_from_spec(spec)
+    model = model_class(**model_kwargs)
+
+    for variable in model.input_variables.values():
+        variable.value = 1.0
+
+    output_variables = model.evaluate(list(model.input_variables.values()))
+    message = {"output_variables": output_variables}
+
+    codec = VariableCodec(model.input_variables, model.output_variables)
+    pickling_codec = VariableCodec(
+        model.input_variables, model.output_variables, compact=False
+    )
+
+    variants = {
+        "pickled_variables": (
+            lambda: pickling_codec.encode(message), pickling_codec.decode
+        ),
+        "compact": (lambda: codec.encode(message), codec.decode),
+    }
+
+    in_queue = multiprocessing.Queue()
+    out_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=echo, args=(in_queue, out_queue))
+    process.start()
+
+    result = {"model": spec, "lume_model_version": lume_model.__version__}
+    for name, (encode, decode) in variants.items():
+        payload = pickle.dumps(encode())
+
+        def round_trip():
+            in_queue.put(encode())
+            decode(out_queue.get())
+
+        # warm up the queue feeder threads
+        round_trip()
+
+        result[name] = {
+            "bytes": len(payload),
+            "dumps_us": time_call(lambda: pickle.dumps(encode()), repeat),
+            "loads_us": time_call(lambda: decode(pickle.loads(payload)), repeat),
+            "queue_round_trip_us": time_call(round_trip, repeat),
+        }
+
+    in_queue.put(None)
+    process.join()
+
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure queue message overhead.")
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        default=["scalar", "scalars:100", "image:64", "image:512"],
+        help='Model specifications: "scalar", "scalars:<n>" or "image:<size>"',
+    )
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    for spec in args.models:
+        print(json.dumps(measure(spec, args.repeat)))
@@ -89,9 +89,10 @@ curdoc().add_root(
     )
 )
 
-curdoc().add_periodic_callback(image_plot.update, 250)
+# update widgets when their process variables change
+image_plot.subscribe()
 for slider in sliders:
-    curdoc().add_periodic_callback(slider.update, 250)
-curdoc().add_periodic_callback(striptool.update, 250)
+    slider.subscribe()
+striptool.subscribe()
+value_table.subscribe()
 curdoc().add_periodic_callback(update_div_text, 250)
-curdoc().add_periodic_callback(value_table.update, 250)
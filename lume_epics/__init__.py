@@ -1,6 +1,6 @@
 import os
 
-os.environ["EPICS_CA_MAX_ARRAY_BYTES"] = "1000000"
+os.environ.setdefault("EPICS_CA_MAX_ARRAY_BYTES", "1000000")
 
 from ._version import get_versions
 
@@ -0,0 +1,186 @@
+"""
+The cache module provides memoization of model outputs for use with
+lume_epics.epics_server.Server. Outputs are keyed on a hash of the complete input
+state, so returning to a previously evaluated configuration publishes the stored
+outputs without evaluating the model.
+
+"""
+import hashlib
+import logging
+import numbers
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from lume_model.variables import InputVariable, OutputVariable
+
+logger = logging.getLogger(__name__)
+
+# approximate bookkeeping cost of a cached variable, in bytes
+_VARIABLE_OVERHEAD = 64
+
+
+class OutputCache:
+    """
+    Bounded least-recently-used cache of model outputs.
+
+    Attributes:
+        max_bytes (int): Maximum estimated size of the cached outputs in bytes.
+
+        ttl (float): Lifetime of an entry in seconds. Entries never expire if None.
+
+        hits (int): Number of lookups served from the cache.
+
+        misses (int): Number of lookups that required a model evaluation.
+
+        evictions (int): Number of entries removed to respect the size limit or
+            because they expired.
+
+        size (int): Estimated size of the cached outputs in bytes.
+
+    """
+
+    def __init__(self, max_bytes: int, ttl: float = None) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_bytes (int): Maximum estimated size of the cached outputs in bytes.
+
+            ttl (float): Lifetime of an entry in seconds.
+
+        """
+        if max_bytes <= 0:
+            raise ValueError("Cache size must be positive.")
+
+        if ttl is not None and ttl <= 0:
+            raise ValueError("Cache entry lifetime must be positive.")
+
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(input_variables: Dict[str, InputVariable]) -> bytes:
+        """Hashes the values of all input variables, including image buffers. 
+        Numeric values are hashed as float64, so equal values hash alike whichever 
+        numeric type the put carried.
+
+        Args:
+            input_variables (Dict[str, InputVariable]): Input variables mapped by
+                name.
+
+        """
+        digest = hashlib.blake2b(digest_size=16)
+
+        for name in sorted(input_variables):
+            value = input_variables[name].value
+            digest.update(name.encode())
+
+            if isinstance(value, np.ndarray):
+                if value.dtype.kind in "biuf":
+                    value = value.astype(np.float64, copy=False)
+
+                digest.update(f"array{value.dtype.str}{value.shape}".encode())
+                digest.update(np.ascontiguousarray(value).data)
+
+            elif isinstance(value, numbers.Real):
+                digest.update(b"real")
+                digest.update(np.float64(value).tobytes())
+
+            elif isinstance(value, str):
+                digest.update(f"str{len(value)}:{value}".encode())
+
+            else:
+                digest.update(repr(value).encode())
+
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[List[OutputVariable]]:
+        """Returns cached outputs for the key, or None on a miss.
+
+        Args:
+            key (bytes): Input state key.
+
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and self._expired(entry):
+                self._remove(key)
+                self.evictions += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["outputs"]
+
+    def put(self, key: bytes, outputs: List[OutputVariable]) -> None:
+        """Stores outputs for the key, evicting least recently used entries to
+        respect the size limit. Outputs larger than the cache are not stored.
+
+        Args:
+            key (bytes): Input state key.
+
+            outputs (List[OutputVariable]): Model outputs for the input state.
+
+        """
+        nbytes = self._estimate_size(outputs)
+
+        if nbytes > self.max_bytes:
+            logger.debug("Output of %s bytes exceeds cache size.", nbytes)
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            while self._entries and self.size + nbytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+            self._entries[key] = {
+                "outputs": outputs,
+                "nbytes": nbytes,
+                "time": time.monotonic(),
+            }
+            self.size += nbytes
+
+    def clear(self) -> None:
+        """Removes all entries.
+
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _expired(self, entry: dict) -> bool:
+        return self.ttl is not None and time.monotonic() - entry["time"] > self.ttl
+
+    def _remove(self, key: bytes) -> None:
+        entry = self._entries.pop(key)
+        self.size -= entry["nbytes"]
+
+    @staticmethod
+    def _estimate_size(outputs: List[OutputVariable]) -> int:
+        nbytes = 0
+        for variable in outputs:
+            nbytes += _VARIABLE_OVERHEAD
+            if isinstance(variable.value, np.ndarray):
+                nbytes += variable.value.nbytes
+
+        return nbytes
@@ -0,0 +1,91 @@
+"""
+Fixed-capacity buffers for sampled process variable values. Buffers are
+preallocated so that appending a sample is O(1) and memory use is bounded however
+long a client runs.
+
+"""
+from typing import Tuple
+
+import numpy as np
+
+
+class TimeSeriesBuffer:
+    """
+    Ring buffer of float64 epoch timestamps and float64 values.
+
+    Each sample is written twice, at its ring position and one capacity further
+    along, so the samples in order always occupy a contiguous region and can be
+    returned as views without copying.
+
+    Attributes:
+        capacity (int): Maximum number of samples held. Once full, the oldest
+            sample is dropped on each append.
+
+        count (int): Number of samples appended since the buffer was created or
+            last cleared, including dropped samples.
+
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Allocate the buffer.
+
+        Args:
+            capacity (int): Maximum number of samples held.
+
+        """
+        if capacity < 1:
+            raise ValueError("Time series capacity must be at least 1.")
+
+        self.capacity = capacity
+        self._time = np.empty(2 * capacity, dtype=np.float64)
+        self._data = np.empty(2 * capacity, dtype=np.float64)
+        self._start = 0
+        self._size = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Add a sample, dropping the oldest sample if the buffer is full.
+
+        Args:
+            timestamp (float): Time of the sample in seconds since the epoch.
+
+            value (float): Sampled value. None is stored as nan.
+
+        """
+        if value is None:
+            value = np.nan
+
+        position = (self._start + self._size) % self.capacity
+        self._time[position] = self._time[position + self.capacity] = timestamp
+        self._data[position] = self._data[position + self.capacity] = value
+
+        self.count += 1
+
+        if self._size < self.capacity:
+            self._size += 1
+
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def view(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns read-only views of the timestamps and values, oldest first. The
+        views are only valid until the next append.
+
+        """
+        time_view = self._time[self._start : self._start + self._size]
+        data_view = self._data[self._start : self._start + self._size]
+        time_view.flags.writeable = False
+        data_view.flags.writeable = False
+
+        return time_view, data_view
+
+    def clear(self) -> None:
+        """Drop all samples.
+
+        """
+        self._start = 0
+        self._size = 0
+        self.count = 0
@@ -2,18 +2,22 @@
 The lume-epics controller serves as the intermediary between variable monitors 
 and process variables served over EPICS.
 """
-from typing import Union, List
+from typing import Callable, Dict, Union, List, Tuple
 import numpy as np
-import copy
 import logging
+import numbers
 from datetime import datetime
 from collections import defaultdict
 from functools import partial 
-from epics import PV
+from epics import PV, caget_many, caput_many
 import threading
 import sys
+import time
 from p4p.client.thread import Context, Disconnected
 
+from lume_epics.client.buffers import TimeSeriesBuffer
+from lume_epics.encoding import EncodedNTNDArray
+
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +31,23 @@ DEFAULT_IMAGE_DATA = {
 
 DEFAULT_SCALAR_VALUE = 0
 
+# Channel Access image children used to build an image, in unpacking order
+CA_IMAGE_CHILDREN = [
+    "ArrayData_RBV",
+    "ArraySizeX_RBV",
+    "ArraySizeY_RBV",
+    "MinX_RBV",
+    "MinY_RBV",
+    "MaxX_RBV",
+    "MaxY_RBV",
+]
+
+# Channel Access image update counter, posted after the other children
+CA_IMAGE_COUNTER = "UniqueId_RBV"
+
+# image children stamped with the timestamp of the counter on each update
+CA_IMAGE_UPDATED_CHILDREN = ["ArrayData_RBV", "MinX_RBV", "MinY_RBV", "MaxX_RBV", "MaxY_RBV"]
+
 
 class Controller:
     """
@@ -47,6 +68,14 @@ class Controller:
 
         last_output_update (datetime): Last update of output variables
 
+        _listeners (Dict[str, list]): Registry mapping pvname to subscribed callbacks
+
+        _image_snapshots (dict): Maps image pvname to the update it was built from, 
+            its version and the cached image data
+
+        _histories (Dict[str, TimeSeriesBuffer]): Registry mapping pvname to the 
+            recorded history of its updates
+
     Example:
         ```
         # create PVAcess controller
@@ -61,7 +90,7 @@ class Controller:
 
     """
 
-    def __init__(self, protocol: str, input_pvs: dict, output_pvs: dict, prefix):
+    def __init__(self, protocol: str, input_pvs: dict, output_pvs: dict, prefix, history_capacity: int = None):
         """
         Initializes controller. Stores protocol and creates context attribute if 
         using pvAccess.
@@ -74,36 +103,67 @@ class Controller:
 
             output_pvs (List[str]): List of output process variable names
 
+            history_capacity (int): Number of updates recorded per scalar process 
+                variable for history queries. Updates are not recorded if None.
+
         """
+        if history_capacity is not None and history_capacity < 1:
+            raise ValueError("History capacity must be at least 1.")
+
         self._protocol = protocol
         self._pv_registry = defaultdict()
         self._input_pvs = input_pvs
         self._output_pvs = output_pvs
         self.last_input_update = ""
         self.last_output_update = ""
-
-        # initalize context for pva
+        self._listeners = defaultdict(list)
+        self._listener_lock = threading.Lock()
+        self._monitor_lock = threading.Lock()
+        self._image_snapshots = {}
+        self._history_capacity = history_capacity
+        self._histories = {}
+        self._history_lock = threading.Lock()
+
+        # initalize context for pva, decoding encoded images
         self._context = None
         if self._protocol == "pva":
-            self._context = Context("pva")
+            self._context = Context("pva", nt={"epics:nt/NTNDArray:1.0": EncodedNTNDArray})
+
+        self._monitor_variables({**input_pvs, **output_pvs}, prefix)
+
 
+    def _monitor_variables(self, variables: dict, prefix: str) -> None:
+        """Sets up monitors for the process variables of lume-model variables.
 
-        for variable in {**input_pvs, **output_pvs}.values():
+        Args:
+            variables (dict): Dict mapping variable name to variable
+
+            prefix (str): Prefix used by the server
+        """
+        for variable in variables.values():
             if variable.variable_type == "image":
                 self.get_image(f"{prefix}:{variable.name}")
             else:
                 self.get_value(f"{prefix}:{variable.name}")
 
 
-    def _ca_value_callback(self, pvname, value, *args, **kwargs):
+    def _ca_value_callback(self, pvname, value, *args, timestamp=None, **kwargs):
         """Callback executed by Channel Access monitor.
 
         Args:
             pvname (str): Process variable name
 
             value (Union[np.ndarray, float]): Value to assign to process variable.
+
+            timestamp (float): Timestamp of the value.
         """
         self._pv_registry[pvname]["value"] = value
+        self._pv_registry[pvname]["timestamp"] = timestamp
+        self._record_history(pvname, value, timestamp)
+
+        # the counter follows the image children of the same update
+        if pvname.endswith(f":{CA_IMAGE_COUNTER}"):
+            self._snapshot_ca_image(pvname[: -len(CA_IMAGE_COUNTER) - 1])
 
         if pvname in self._input_pvs:
             self.last_input_update = datetime.now().strftime('%m/%d/%Y, %H:%M:%S')
@@ -111,6 +171,8 @@ class Controller:
         if pvname in self._output_pvs:
             self.last_output_update = datetime.now().strftime('%m/%d/%Y, %H:%M:%S')
 
+        self._notify(pvname, value)
+
 
     def _ca_connection_callback(self, *, pvname, conn, pv):
         """Callback used for monitoring connection and setting values to None on disconnect.
@@ -118,6 +180,8 @@ class Controller:
         # if disconnected, set value to None
         if not conn:
             self._pv_registry[pvname]["value"] = None
+            self._record_history(pvname, None, None)
+            self._notify(pvname, None)
 
 
     def _pva_value_callback(self, pvname, value):
@@ -129,9 +193,10 @@ class Controller:
             value (Union[np.ndarray, float]): Value to assign to process variable.
         """
         if isinstance(value, Disconnected):
-            self._pv_registry[pvname]["value"] = None
-        else:
-            self._pv_registry[pvname]["value"] = value
+            value = None
+
+        self._pv_registry[pvname]["value"] = value
+        self._record_history(pvname, value, getattr(value, "timestamp", None))
 
         if pvname in self._input_pvs:
             self.last_input_update = datetime.now().strftime('%m/%d/%Y, %H:%M:%S')
@@ -139,6 +204,149 @@ class Controller:
         if pvname in self._output_pvs:
             self.last_output_update = datetime.now().strftime('%m/%d/%Y, %H:%M:%S')
 
+        self._notify(pvname, value)
+
+
+    def _record_history(self, pvname: str, value, timestamp: float) -> None:
+        """Records a scalar update in the history of a process variable. A value of 
+        None, on disconnect, is recorded as nan. Timestamps are kept in order, so 
+        updates stamped before the last recorded update take its timestamp.
+
+        Args:
+            pvname (str): Process variable name
+
+            value (Union[np.ndarray, float]): New value
+
+            timestamp (float): Server timestamp of the value, seconds since the 
+                epoch. Disconnects carry no server timestamp and pass None to take 
+                the timestamp of the last recorded update.
+        """
+        if self._history_capacity is None:
+            return
+
+        if value is not None and (
+            isinstance(value, bool) or not isinstance(value, numbers.Real)
+        ):
+            return
+
+        with self._history_lock:
+            history = self._histories.get(pvname)
+
+            if history is None:
+                if value is None:
+                    return
+
+                history = TimeSeriesBuffer(self._history_capacity)
+                self._histories[pvname] = history
+
+            # the client clock is only used before any server timestamp is known
+            last = history.view()[0][-1] if len(history) else None
+            if timestamp is None:
+                timestamp = time.time() if last is None else last
+
+            elif last is not None:
+                timestamp = max(timestamp, last)
+
+            history.append(timestamp, value)
+
+
+    def history(
+        self, pvname: str, since: float = None, max_points: int = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the recorded updates of a scalar process variable, oldest first, 
+        as read-only views of timestamps and values. The views are overwritten as 
+        the history wraps, so copy them to keep the samples.
+
+        Args:
+            pvname (str): Process variable name
+
+            since (float): Only return updates timestamped after this time, in 
+                seconds since the epoch.
+
+            max_points (int): Only return the most recent max_points updates.
+
+        """
+        if self._history_capacity is None:
+            raise ValueError("Controller was not created with a history capacity.")
+
+        self._set_up_pv_monitor(pvname)
+
+        with self._history_lock:
+            history = self._histories.get(pvname)
+
+            if history is None:
+                return np.empty(0), np.empty(0)
+
+            times, values = history.view()
+
+        start = 0
+        if since is not None:
+            start = int(np.searchsorted(times, since, side="right"))
+
+        if max_points is not None:
+            start = max(start, len(times) - max_points)
+
+        return times[start:], values[start:]
+
+
+    def _notify(self, pvname: str, value) -> None:
+        """Calls the listeners subscribed to a process variable.
+
+        Args:
+            pvname (str): Process variable name
+
+            value (Union[np.ndarray, float]): New value, None on disconnect.
+        """
+        with self._listener_lock:
+            listeners = list(self._listeners.get(pvname, []))
+
+        for listener in listeners:
+            try:
+                listener(pvname, value)
+            except Exception:
+                logger.exception("Listener for %s failed.", pvname)
+
+
+    def subscribe(self, pvname: str, callback: Callable) -> None:
+        """Registers a callback executed whenever the value of a process variable 
+        changes. Callbacks are executed on the monitor thread as 
+        callback(pvname, value), with a value of None on disconnect. For images 
+        served over Channel Access, subscribe to the :ArrayData_RBV process variable 
+        and to :UniqueId_RBV, which changes once an image is complete.
+
+        Args:
+            pvname (str): Process variable name
+
+            callback (Callable): Function called with the process variable name and 
+                value.
+        """
+        self._set_up_pv_monitor(pvname)
+
+        with self._listener_lock:
+            self._listeners[pvname].append(callback)
+
+
+    def unsubscribe(self, pvname: str, callback: Callable) -> None:
+        """Removes a callback registered with subscribe.
+
+        Args:
+            pvname (str): Process variable name
+
+            callback (Callable): Subscribed callback.
+        """
+        with self._listener_lock:
+            try:
+                self._listeners[pvname].remove(callback)
+            except ValueError:
+                logger.debug("Callback not subscribed to %s.", pvname)
+
+
+    @property
+    def protocol(self) -> str:
+        """Protocol used by the controller, "ca" or "pva".
+        """
+        return self._protocol
+
 
     def _set_up_pv_monitor(self, pvname):
         """Set up process variable monitor.
@@ -147,15 +355,32 @@ class Controller:
             pvname (str): Process variable name
 
         """
-        if pvname in self._pv_registry:
+        # entries are registered before their monitor is created, so only complete 
+        # entries are used without the lock
+        registered = self._pv_registry.get(pvname)
+        if registered is not None and registered["pv"] is not None:
             return
 
+        # controllers may be shared between threads, wait for the monitor creation
+        with self._monitor_lock:
+            if pvname not in self._pv_registry:
+                self._create_pv_monitor(pvname)
+
+
+    def _create_pv_monitor(self, pvname):
+        """Create process variable monitor and registry entry.
+
+        Args:
+            pvname (str): Process variable name
+
+        """
         if self._protocol == "ca":
             # add to registry (must exist for connection callback)
             self._pv_registry[pvname] = {"pv": None, "value": None}
 
             # create the pv
-            pv_obj = PV(pvname, callback=self._ca_value_callback, connection_callback=self._ca_connection_callback)
+            # always monitor, pyepics skips large arrays by default
+            pv_obj = PV(pvname, callback=self._ca_value_callback, connection_callback=self._ca_connection_callback, auto_monitor=True)
 
             # update registry
             self._pv_registry[pvname]["pv"] = pv_obj
@@ -209,50 +434,148 @@ class Controller:
             pvname (str): Image process variable name
 
         """
-        image = None
+        return self.get_image_with_version(pvname)[1]
+
+
+    def get_image_with_version(self, pvname) -> tuple:
+        """Gets image data via controller protocol along with the version of the 
+        image. The version increases with each new image received, so callers may 
+        skip work for images they have already processed. Image arrays are shared 
+        with the controller cache and must not be modified.
+
+        Args:
+            pvname (str): Image process variable name
+
+        Returns:
+            tuple: Image version and image data. The version is 0 for the default 
+                image data and None when the server does not provide image versions.
+
+        """
+        cached = None
         if self._protocol == "ca":
-            image_flat = self.get(f"{pvname}:ArrayData_RBV")
-            nx = self.get(f"{pvname}:ArraySizeX_RBV")
-            ny = self.get(f"{pvname}:ArraySizeY_RBV")
-            x = self.get(f"{pvname}:MinX_RBV")
-            y = self.get(f"{pvname}:MinY_RBV")
-            x_max = self.get(f"{pvname}:MaxX_RBV")
-            y_max = self.get(f"{pvname}:MaxY_RBV")
+            for child in CA_IMAGE_CHILDREN:
+                self._set_up_pv_monitor(f"{pvname}:{child}")
 
-            if all([image_def is not None for image_def in [image_flat, nx, ny, x, y, x_max, y_max]]):
-                dw = x_max - x
-                dh = y_max - y
+            counter = self.get(f"{pvname}:{CA_IMAGE_COUNTER}")
+            cached = self._image_snapshots.get(pvname)
 
-                image = image_flat.reshape(int(nx), int(ny))
+            # reuse the snapshot until the counter changes
+            if counter is None or cached is None or cached[0] != counter:
+                snapshot = self._snapshot_ca_image(pvname)
 
-        elif self._protocol == "pva":
-            # context returns numpy array with WRITEABLE=False
-            # copy to manipulate array below
+                if counter is None and snapshot is not None:
+                    cached = (None, None, snapshot)
+
+                # keep the last complete update while a newer one is still arriving
+                elif snapshot is not None:
+                    cached = self._image_snapshots[pvname]
 
+        elif self._protocol == "pva":
             image = self.get(pvname)
+            cached = self._image_snapshots.get(pvname)
 
-            if image is not None:
+            # build a snapshot once per value received, the image array is 
+            # read-only and shared without copying
+            if image is not None and (cached is None or cached[0] is not image):
                 attrib = image.attrib
-                x = attrib["x_min"]
-                y = attrib["y_min"]
-                dw = attrib["x_max"] - attrib["x_min"]
-                dh = attrib["y_max"] - attrib["y_min"]
-                image = copy.copy(image)
-
-        if image is not None:
-            return {
-                "image": [image],
-                "x": [x],
-                "y": [y],
-                "dw": [dw],
-                "dh": [dh],
-            }
+                snapshot = {
+                    "image": [image],
+                    "x": [attrib["x_min"]],
+                    "y": [attrib["y_min"]],
+                    "dw": [attrib["x_max"] - attrib["x_min"]],
+                    "dh": [attrib["y_max"] - attrib["y_min"]],
+                }
+                cached = self._cache_image(pvname, image, snapshot)
+
+        if cached is not None:
+            _, version, snapshot = cached
 
         else:
-            return DEFAULT_IMAGE_DATA
+            version, snapshot = 0, DEFAULT_IMAGE_DATA
+
+        # new lists so callers may replace entries without touching the cache
+        return version, {key: list(value) for key, value in snapshot.items()}
+
+
+    def _cache_image(self, pvname: str, key, snapshot: dict) -> tuple:
+        """Caches image data with the key identifying its update and a new version.
 
+        Args:
+            pvname (str): Image process variable name
+
+            key: Image update counter or value the snapshot was built from.
+
+            snapshot (dict): Image data
+
+        """
+        previous = self._image_snapshots.get(pvname)
+        version = previous[1] + 1 if previous is not None else 1
+        cached = (key, version, snapshot)
+        self._image_snapshots[pvname] = cached
+
+        return cached
+
+
+    def _snapshot_ca_image(self, pvname: str) -> dict:
+        """Builds Channel Access image data from the current values of the image 
+        children. The server posts the update counter after the other children of an 
+        update and stamps them all with the same timestamp, so the image is only built 
+        once every child carries the timestamp of the counter. The snapshot is cached 
+        with the counter. Servers without a counter fall back to the current values.
+
+        Args:
+            pvname (str): Image process variable name
 
-    def put(self, pvname, value: Union[np.ndarray, float], timeout=1.0) -> None:
+        Returns:
+            dict: Image data, None if the children are incomplete.
+
+        """
+        registered = self._pv_registry.get(f"{pvname}:{CA_IMAGE_COUNTER}") or {}
+        counter = registered.get("value")
+
+        values = []
+        timestamps = []
+        for child in CA_IMAGE_CHILDREN:
+            registered_child = self._pv_registry.get(f"{pvname}:{child}") or {}
+            values.append(registered_child.get("value"))
+
+            if child in CA_IMAGE_UPDATED_CHILDREN:
+                timestamps.append(registered_child.get("timestamp"))
+
+        if any(value is None for value in values):
+            return None
+
+        if counter is not None and any(
+            timestamp != registered.get("timestamp") for timestamp in timestamps
+        ):
+            logger.debug(f"Incomplete image update for {pvname}.")
+            return None
+
+        image_flat, nx, ny, x, y, x_max, y_max = values
+
+        if image_flat.size != int(nx) * int(ny):
+            logger.debug(f"Incomplete image update for {pvname}.")
+            return None
+
+        # shared with callers through the cache, as with pvAccess images
+        image = image_flat.reshape(int(nx), int(ny))
+        image.flags.writeable = False
+
+        snapshot = {
+            "image": [image],
+            "x": [x],
+            "y": [y],
+            "dw": [x_max - x],
+            "dh": [y_max - y],
+        }
+
+        if counter is not None:
+            self._cache_image(pvname, counter, snapshot)
+
+        return snapshot
+
+
+    def put(self, pvname, value: Union[np.ndarray, float], timeout=1.0, wait: bool = False) -> None:
         """Assign the value of a process variable.
 
         Args:
@@ -262,6 +585,9 @@ class Controller:
 
             timeout (float): Operation timeout in seconds
 
+            wait (bool): Wait for Channel Access puts to complete. pvAccess puts 
+                always wait.
+
         """
         self._set_up_pv_monitor(pvname)
 
@@ -271,7 +597,7 @@ class Controller:
         # if the value is registered
         if registered is not None:
             if self._protocol == "ca":
-                self._pv_registry[pvname]["pv"].put(value, timeout=timeout)
+                self._pv_registry[pvname]["pv"].put(value, wait=wait, timeout=timeout)
 
             elif self._protocol == "pva":
                 self._context.put(pvname, value, throw=False, timeout=timeout)
@@ -279,6 +605,162 @@ class Controller:
         else:
             logger.debug(f"No initial value set for {pvname}.")
 
+    def put_many(self, values: Dict[str, Union[np.ndarray, float]], timeout=1.0) -> Dict[str, bool]:
+        """Assign the values of several process variables in a single batch. Puts are 
+        issued together and awaited together, so the server receives the whole 
+        configuration at once.
+
+        Args:
+            values (Dict[str, Union[np.ndarray, float]]): Maps process variable name to
+                value.
+
+            timeout (float): Operation timeout in seconds for the whole batch
+
+        Returns:
+            Dict[str, bool]: Maps process variable name to whether the put succeeded.
+
+        """
+        pvnames = list(values.keys())
+
+        if self._protocol == "ca":
+            results = caput_many(
+                pvnames,
+                list(values.values()),
+                wait="all",
+                connection_timeout=timeout,
+                put_timeout=timeout,
+            )
+            status = [result == 1 for result in results]
+
+        elif self._protocol == "pva":
+            results = self._context.put(
+                pvnames, list(values.values()), timeout=timeout, throw=False
+            )
+            # puts completed before the timeout return None, others their exception
+            status = [result is None for result in results]
+
+        for pvname, succeeded in zip(pvnames, status):
+            if not succeeded:
+                logger.debug(f"Unable to put value to {pvname}.")
+
+        return dict(zip(pvnames, status))
+
+    def get_many(self, pvnames: List[str], timeout=1.0) -> Dict[str, Union[np.ndarray, float]]:
+        """Read the values of several process variables in a single batch.
+
+        Args:
+            pvnames (List[str]): Process variable names
+
+            timeout (float): Operation timeout in seconds
+
+        Returns:
+            Dict[str, Union[np.ndarray, float]]: Maps process variable name to value, 
+                None for process variables that could not be read.
+
+        """
+        pvnames = list(pvnames)
+
+        if self._protocol == "ca":
+            values = caget_many(pvnames, timeout=timeout, connection_timeout=timeout)
+
+        elif self._protocol == "pva":
+            values = self._context.get(pvnames, throw=False, timeout=timeout)
+            values = [
+                None if isinstance(value, Exception) else value for value in values
+            ]
+
+        return dict(zip(pvnames, values))
+
     def close(self):
         if self._protocol == "pva":
             self._context.close()
+
+        elif self._protocol == "ca":
+            for registered in list(self._pv_registry.values()):
+                if registered["pv"] is not None:
+                    registered["pv"].clear_callbacks()
+                    registered["pv"].disconnect()
+
+
+# controllers shared within the process, keyed by protocol and prefix
+_shared_controllers = {}
+_shared_controllers_lock = threading.Lock()
+
+
+def acquire_controller(
+    protocol: str,
+    input_pvs: dict,
+    output_pvs: dict,
+    prefix: str,
+    history_capacity: int = None,
+) -> Controller:
+    """Returns a controller shared by all callers in the process with the same 
+    protocol and prefix, creating it on first use. Sharing a controller, for example 
+    between the sessions of a bokeh server, keeps a single monitor and image cache per 
+    process variable. Each call must be matched by a call to release_controller.
+
+    Args:
+        protocol (str): Protocol for getting values from variables ("pva" for pvAccess,
+            "ca" for Channel Access)
+
+        input_pvs (dict): Dict mapping input variable name to variable
+
+        output_pvs (dict): Dict mapping output variable name to variable
+
+        prefix (str): Prefix used by the server
+
+        history_capacity (int): History capacity of the controller, used when the 
+            controller is created.
+
+    """
+    key = (protocol, prefix)
+    variables = {**input_pvs, **output_pvs}
+
+    with _shared_controllers_lock:
+        entry = _shared_controllers.get(key)
+
+        if entry is not None:
+            entry[1] += 1
+
+    if entry is not None:
+        # variables may not have been monitored by earlier callers
+        entry[0]._monitor_variables(variables, prefix)
+        return entry[0]
+
+    # connecting may be slow, so other callers are not blocked meanwhile
+    controller = Controller(
+        protocol, input_pvs, output_pvs, prefix, history_capacity=history_capacity
+    )
+
+    with _shared_controllers_lock:
+        entry = _shared_controllers.setdefault(key, [controller, 0])
+        entry[1] += 1
+
+    # created concurrently by another caller
+    if entry[0] is not controller:
+        controller.close()
+        entry[0]._monitor_variables(variables, prefix)
+
+    return entry[0]
+
+
+def release_controller(controller: Controller) -> None:
+    """Releases a controller returned by acquire_controller. The controller is closed 
+    once released by every caller.
+
+    Args:
+        controller (Controller): Shared controller
+
+    """
+    with _shared_controllers_lock:
+        for key, entry in _shared_controllers.items():
+            if entry[0] is controller:
+                entry[1] -= 1
+
+                if entry[1] == 0:
+                    del _shared_controllers[key]
+                    controller.close()
+
+                return
+
+    logger.warning("Controller released was not acquired.")
@@ -5,18 +5,21 @@ EPICs.
 
 """
 
-from datetime import datetime
 import time
 import logging
 
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Tuple
 
 from lume_epics.client.controller import Controller
+from lume_epics.client.buffers import TimeSeriesBuffer
 from lume_model.variables import ImageVariable, ScalarVariable
 
 logger = logging.getLogger(__name__)
 
+# number of samples held by a time series monitor unless configured
+DEFAULT_TIME_SERIES_CAPACITY = 100000
+
 class PVImage:
     """
     Monitor for updating and formatting image data.
@@ -37,7 +40,11 @@ class PVImage:
     """
 
     def __init__(
-        self, prefix: str, variable: ImageVariable, controller: Controller,
+        self,
+        prefix: str,
+        variable: ImageVariable,
+        controller: Controller,
+        preview: bool = False,
     ) -> None:
         """Initialize monitor for an image variable.
 
@@ -48,6 +55,9 @@ class PVImage:
 
             controller (Controller): Controller object for accessing process variable.
 
+            preview (bool): Monitor the binned preview served for the image rather 
+                than the full image. Requires a server started with a preview_size.
+
         """
         self.units = None
         # check if units has been set
@@ -55,10 +65,22 @@ class PVImage:
             self.units = variable.units.split(":")
 
         self.pvname = f"{prefix}:{variable.name}"
+        if preview:
+            self.pvname += ":Preview"
+
         self.controller = controller
         self.axis_labels = variable.axis_labels
         self.axis_units = variable.axis_units
 
+        # image data arrives with the array process variable over Channel Access,
+        # followed by the update counter once the image is complete
+        self._update_pvnames = [self.pvname]
+        if controller.protocol == "ca":
+            self._update_pvnames = [
+                f"{self.pvname}:ArrayData_RBV",
+                f"{self.pvname}:UniqueId_RBV",
+            ]
+
     def poll(self) -> Dict[str, list]:
         """Collects image data and builds image data dictionary.
 
@@ -66,16 +88,48 @@ class PVImage:
 
         return self.controller.get_image(self.pvname)
 
+    def poll_with_version(self) -> tuple:
+        """Collects image data along with the image version, which only changes 
+        when a new image is received.
+
+        """
+
+        return self.controller.get_image_with_version(self.pvname)
+
+    def subscribe(self, callback: Callable) -> None:
+        """Register a callback executed when the process variable changes.
+
+        Args:
+            callback (Callable): Function called with the process variable name and 
+                value.
+
+        """
+        for pvname in self._update_pvnames:
+            self.controller.subscribe(pvname, callback)
+
+    def unsubscribe(self, callback: Callable) -> None:
+        """Remove a callback registered with subscribe.
+
+        Args:
+            callback (Callable): Subscribed callback.
+
+        """
+        for pvname in self._update_pvnames:
+            self.controller.unsubscribe(pvname, callback)
+
 
 class PVTimeSeries:
     """
-    Monitor for time series variables.
+    Monitor for time series variables. Samples are held in a fixed-capacity ring 
+    buffer, so the oldest samples are dropped once the capacity is reached.
 
     Attributes:
-        time (np.ndarray): Array of times sampled.
+        time (np.ndarray): Array of times sampled, in seconds since the epoch.
 
         data (np.ndarray): Array of sampled data.
 
+        capacity (int): Maximum number of samples held.
+
         prefix (str): Prefix used for initializing server.
 
         variable (ScalarVariable): Variable monitored for time series.
@@ -89,7 +143,11 @@ class PVTimeSeries:
     """
 
     def __init__(
-        self, prefix: str, variable: ScalarVariable, controller: Controller,
+        self,
+        prefix: str,
+        variable: ScalarVariable,
+        controller: Controller,
+        capacity: int = DEFAULT_TIME_SERIES_CAPACITY,
     ) -> None:
         """Initializes monitor attributes.
 
@@ -100,11 +158,13 @@ class PVTimeSeries:
 
             controller (Controller): Controller object for accessing process variable.
 
+            capacity (int): Maximum number of samples held.
+
         """
         self.pvname = f"{prefix}:{variable.name}"
         self.tstart = time.time()
-        self.time = np.array([])
-        self.data = np.array([])
+        self.capacity = capacity
+        self._buffer = TimeSeriesBuffer(capacity)
 
         self.units = None
         # check if units has been set
@@ -113,23 +173,55 @@ class PVTimeSeries:
 
         self.controller = controller
 
+    @property
+    def time(self) -> np.ndarray:
+        return self._buffer.view()[0]
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._buffer.view()[1]
+
+    @property
+    def count(self) -> int:
+        """Number of samples collected since the monitor was created or reset.
+        """
+        return self._buffer.count
+
     def poll(self) -> Tuple[np.ndarray]:
         """
-        Collects image data via appropriate protocol and returns time and data.
+        Collects a sample via appropriate protocol and returns time and data. The 
+        returned arrays are read-only views, valid until the next poll.
 
         """
-        t = datetime.now()
+        t = time.time()
 
         v = self.controller.get_value(self.pvname)
 
-        self.time = np.append(self.time, t)
-        self.data = np.append(self.data, v)
+        self._buffer.append(t, v)
 
-        return self.time, self.data
+        return self._buffer.view()
 
     def reset(self) -> None:
-        self.time = np.array([])
-        self.data = np.array([])
+        self._buffer.clear()
+
+    def subscribe(self, callback: Callable) -> None:
+        """Register a callback executed when the process variable changes.
+
+        Args:
+            callback (Callable): Function called with the process variable name and 
+                value.
+
+        """
+        self.controller.subscribe(self.pvname, callback)
+
+    def unsubscribe(self, callback: Callable) -> None:
+        """Remove a callback registered with subscribe.
+
+        Args:
+            callback (Callable): Subscribed callback.
+
+        """
+        self.controller.unsubscribe(self.pvname, callback)
 
 
 class PVScalar:
@@ -174,3 +266,22 @@ class PVScalar:
 
         """
         return self.controller.get_value(self.pvname)
+
+    def subscribe(self, callback: Callable) -> None:
+        """Register a callback executed when the process variable changes.
+
+        Args:
+            callback (Callable): Function called with the process variable name and 
+                value.
+
+        """
+        self.controller.subscribe(self.pvname, callback)
+
+    def unsubscribe(self, callback: Callable) -> None:
+        """Remove a callback registered with subscribe.
+
+        Args:
+            callback (Callable): Subscribed callback.
+
+        """
+        self.controller.unsubscribe(self.pvname, callback)
@@ -3,8 +3,9 @@ from bokeh.layouts import column, row, gridplot, layout
 from bokeh.models.widgets import Select
 from bokeh.models import Div
 from bokeh import palettes
+from bokeh.io import curdoc
 
-from lume_epics.client.controller import Controller
+from lume_epics.client.controller import acquire_controller, release_controller
 
 from lume_epics.client.widgets.tables import ValueTable 
 from lume_epics.client.widgets.controls import build_sliders, EntryTable
@@ -115,8 +116,10 @@ class LayoutBuilder():
 
 
 
-def render_from_yaml(config_file, prefix: str, protocol: str, read_only=False, striptool_limit=50, ncol_widgets=5):
+def render_from_yaml(config_file, prefix: str, protocol: str, read_only=False, striptool_limit=50, ncol_widgets=5, push_updates=False):
     """Renders a bokeh layout from the configuration file. Returns layout and callbacks. 
+    The controller is shared with the other sessions rendered in the process and 
+    released when the session of the current document is destroyed.
 
     Args:
         config_file: Opened configuration file
@@ -125,6 +128,9 @@ def render_from_yaml(config_file, prefix: str, protocol: str, read_only=False, s
         read_only (bool): Whether to render the page as read only
         striptool_limit (int): Maximum number of steps to display on the striptool
         ncol_widgets (int): Number of columns for rendering widgets
+        push_updates (bool): Subscribe widgets to update the current document when 
+            their process variables change. Only callbacks that must still be polled
+            are returned.
 
     Returns
         layout
@@ -168,12 +174,20 @@ def render_from_yaml(config_file, prefix: str, protocol: str, read_only=False, s
         if variable.variable_type == "image":
             variable_output_images.append(variable)
 
-    # set up controller
-    controller = Controller(protocol)
+    # share the controller with other sessions of the process
+    controller = acquire_controller(protocol, input_variables, output_variables, prefix)
+    curdoc().on_session_destroyed(lambda session_context: release_controller(controller))
 
     # track callbacks
     callbacks = []
 
+    def track(widget):
+        if push_updates:
+            widget.subscribe()
+
+        else:
+            callbacks.append(widget.update)
+
     # track all inputs
     input_value_vars = constant_scalars + variable_input_scalars
 
@@ -186,7 +200,7 @@ def render_from_yaml(config_file, prefix: str, protocol: str, read_only=False, s
         image = ImagePlot([variable], controller, prefix)
         image.build_plot(pal)
         layout_builder.add_input(image.plot, title=variable.name)
-        callbacks.append(image.update)
+        track(image)
 
     # build input striptools
     if read_only:
@@ -194,7 +208,7 @@ def render_from_yaml(config_file, prefix: str, protocol: str, read_only=False, s
         for variable in variable_input_scalars:
             striptool = Striptool([variable], controller, prefix, limit=striptool_limit)
             layout_builder.add_input(striptool.plot, title=variable.name)
-            callbacks.append(striptool.update)
+            track(striptool)
 
     # build sliders and value entry table
     else:
@@ -203,7 +217,7 @@ def render_from_yaml(config_file, prefix: str, protocol: str, read_only=False, s
         slider_stack = []
         for slider in sliders:
             slider_stack.append(slider.bokeh_slider)
-            callbacks.append(slider.update)
+            track(slider)
 
         layout_builder.add_input_stack(slider_stack)
 
@@ -217,7 +231,7 @@ def render_from_yaml(config_file, prefix: str, protocol: str, read_only=False, s
     # add value table callback
     value_table = ValueTable(input_value_vars, controller, prefix)
     layout_builder.add_input(value_table.table)
-    callbacks.append(value_table.update)
+    track(value_table)
 
 
     # add output value table callback
@@ -227,13 +241,13 @@ def render_from_yaml(config_file, prefix: str, protocol: str, read_only=False, s
         value_table.table.autosize_mode="fit_columns"
 
     layout_builder.add_output(output_value_table.table)
-    callbacks.append(output_value_table.update)
+    track(output_value_table)
 
     for variable in variable_output_images:
         image = ImagePlot([variable], controller, prefix)
         image.build_plot(pal)
         layout_builder.add_output(image.plot, title=variable.name)
-        callbacks.append(image.update)
+        track(image)
 
     # build output striptools
     if read_only:
@@ -242,7 +256,7 @@ def render_from_yaml(config_file, prefix: str, protocol: str, read_only=False, s
 
             striptool = Striptool([variable], controller, prefix, limit=striptool_limit)
             layout_builder.add_output(striptool.plot, title=variable.name)
-            callbacks.append(striptool.update)
+            track(striptool)
             
     else:
         output_striptool = Striptool(variable_output_scalars, controller, prefix, limit=striptool_limit)
@@ -250,7 +264,7 @@ def render_from_yaml(config_file, prefix: str, protocol: str, read_only=False, s
         layout_builder.add_output_stack([output_striptool.selection, output_striptool.plot])
 
         # add the update callback
-        callbacks.append(output_striptool.update)
+        track(output_striptool)
 
     layout = layout_builder.build_layout()
 
@@ -7,6 +7,8 @@ Controls may be built for lume-model ScalarInputVariables.
 from functools import partial
 from typing import Union, List
 import logging
+import threading
+import time
 
 from bokeh.models import (
     Slider,
@@ -24,25 +26,83 @@ from bokeh.models import (
 from bokeh.events import Tap, MouseLeave, ButtonClick
 from bokeh.models.callbacks import CustomJS
 from bokeh import document
+from bokeh.document import Document
 from bokeh.layouts import column, row, gridplot
 
 from lume_model.variables import ScalarInputVariable
 from lume_epics.client.controller import Controller
+from lume_epics.client.monitors import PVScalar
+from lume_epics.client.widgets.updates import DocumentUpdater
 
 logger = logging.getLogger(__name__)
 
 
+# policies for putting slider values
+PUT_POLICIES = ("immediate", "release", "rate", "coalesce")
+
+# marks the absence of a pending slider value
+_NO_VALUE = object()
+
+
 class EpicsSlider:
     """EPICS based Slider used for building bokeh sliders and synchronizing process variable values.
 
+    Slider values are put according to a put policy:
+        - "immediate": put every value, including intermediate values of a drag
+        - "release": put only the value at which the slider is released
+        - "rate": put at most max_rate values per second, followed by a put of the 
+            final value
+        - "coalesce": put in the background, replacing values that arrive while a 
+            put is in flight with the latest value
+
+    Attributes:
+        suppressed_puts (int): Number of slider values that were not put.
+
     """
 
     def __init__(
-        self, prefix: str, variable: ScalarInputVariable, controller: Controller
+        self,
+        prefix: str,
+        variable: ScalarInputVariable,
+        controller: Controller,
+        put_policy: str = "immediate",
+        max_rate: float = 10.0,
     ):
+        """
+        Args:
+            prefix (str): Prefix used for serving process variables.
+
+            variable (ScalarInputVariable): Variable associated with the slider.
+
+            controller (Controller): Controller object for getting process variable values.
+
+            put_policy (str): One of "immediate", "release", "rate" or "coalesce".
+
+            max_rate (float): Maximum puts per second for the "rate" policy.
+
+        """
+        if put_policy not in PUT_POLICIES:
+            raise ValueError(
+                f"Unknown put policy {put_policy}. Must be one of {PUT_POLICIES}."
+            )
+
+        if put_policy == "rate" and max_rate <= 0:
+            raise ValueError("Slider max_rate must be positive.")
+
         self.prefix = prefix
         self.controller = controller
         self.variable = variable
+        self.put_policy = put_policy
+        self.max_rate = max_rate
+        self.suppressed_puts = 0
+
+        self._lock = threading.Lock()
+        self._updating = False
+        self._pending = _NO_VALUE
+        self._in_flight = False
+        self._last_put = -float("inf")
+        self._timer = None
+
         self.build_slider()
 
     def build_slider(self):
@@ -74,22 +134,144 @@ class EpicsSlider:
             format="0[.]0000",
         )
 
-        # set up callback
-        self.bokeh_slider.on_change(
-            "value",
-            partial(set_pv_from_slider, pvname=self.pvname, controller=self.controller),
-        )
+        # set up callbacks
+        self.bokeh_slider.on_change("value", self._on_value)
+
+        if self.put_policy == "release":
+            self.bokeh_slider.on_change("value_throttled", self._on_release)
+
+    def _on_value(self, attr, old, new) -> None:
+        """Bokeh callback for slider value changes.
+        """
+        # values set by update are already held by the process variable
+        if self._updating:
+            return
+
+        if self.put_policy == "immediate":
+            set_pv_from_slider(attr, old, new, self.pvname, self.controller)
+
+        elif self.put_policy == "release":
+            # values are suppressed once replaced, the last is put on release
+            with self._lock:
+                if self._pending is not _NO_VALUE:
+                    self.suppressed_puts += 1
+
+                self._pending = new
+
+        elif self.put_policy == "rate":
+            self._put_rate_limited(new)
+
+        elif self.put_policy == "coalesce":
+            self._put_coalesced(new)
+
+    def _on_release(self, attr, old, new) -> None:
+        """Bokeh callback for the slider value on release.
+        """
+        with self._lock:
+            self._pending = _NO_VALUE
+
+        self.controller.put(self.pvname, new)
+
+    def _put_rate_limited(self, value: float) -> None:
+        """Put a value if the rate allows, otherwise hold it for a trailing put.
+        """
+        interval = 1.0 / self.max_rate
+
+        with self._lock:
+            now = time.monotonic()
+            if self._timer is None and now - self._last_put >= interval:
+                self._last_put = now
+
+            else:
+                if self._pending is not _NO_VALUE:
+                    self.suppressed_puts += 1
+
+                self._pending = value
+
+                if self._timer is None:
+                    delay = max(self._last_put + interval - now, 0)
+                    self._timer = threading.Timer(delay, self._put_trailing)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+                return
+
+        self.controller.put(self.pvname, value)
+
+    def _put_trailing(self) -> None:
+        """Put the latest value held by the rate limit.
+        """
+        with self._lock:
+            value, self._pending = self._pending, _NO_VALUE
+            self._timer = None
+            self._last_put = time.monotonic()
+
+        if value is not _NO_VALUE:
+            self.controller.put(self.pvname, value)
+
+    def _put_coalesced(self, value: float) -> None:
+        """Put a value in the background or replace the value waiting for an in 
+        flight put.
+        """
+        with self._lock:
+            if self._in_flight:
+                if self._pending is not _NO_VALUE:
+                    self.suppressed_puts += 1
+
+                self._pending = value
+                return
+
+            self._in_flight = True
+
+        threading.Thread(target=self._put_in_flight, args=(value,), daemon=True).start()
+
+    def _put_in_flight(self, value: float) -> None:
+        """Put values until no value is waiting, executed on a put thread.
+        """
+        while True:
+            try:
+                self.controller.put(self.pvname, value, wait=True)
+
+            except Exception:
+                logger.exception("Put to %s failed.", self.pvname)
+
+            with self._lock:
+                if self._pending is _NO_VALUE:
+                    self._in_flight = False
+                    return
+
+                value, self._pending = self._pending, _NO_VALUE
 
     def update(self):
         """
         Updates bokeh slider with the process variable value.
 
         """
-        self.bokeh_slider.value = self.controller.get_value(self.pvname)
+        self._updating = True
+        try:
+            self.bokeh_slider.value = self.controller.get_value(self.pvname)
+
+        finally:
+            self._updating = False
+
+    def subscribe(self, document: Document = None) -> None:
+        """Update the slider on a bokeh document whenever the process variable 
+        changes, in place of periodic calls to update.
+
+        Args:
+            document (Document): Bokeh document. Defaults to the current document.
+
+        """
+        monitor = PVScalar(self.prefix, self.variable, self.controller)
+        self._updater = DocumentUpdater([monitor], self.update, document)
 
 
 def build_sliders(
-    variables: List[ScalarInputVariable], controller: Controller, prefix: str,
+    variables: List[ScalarInputVariable],
+    controller: Controller,
+    prefix: str,
+    put_policy: str = "immediate",
+    max_rate: float = 10.0,
 ) -> List[Slider]:
     """
     Build sliders for a list of variables.
@@ -101,11 +283,18 @@ def build_sliders(
 
         controller (Controller): Controller object for getting process variable values.
 
+        put_policy (str): Put policy of the sliders, one of "immediate", "release", 
+            "rate" or "coalesce".
+
+        max_rate (float): Maximum puts per second for the "rate" policy.
+
     """
     sliders = []
 
     for variable in variables:
-        slider = EpicsSlider(prefix, variable, controller,)
+        slider = EpicsSlider(
+            prefix, variable, controller, put_policy=put_policy, max_rate=max_rate
+        )
         sliders.append(slider)
 
     return sliders
@@ -214,10 +403,15 @@ class EntryTable:
         """
         Function to submit values entered into table
         """
+        values = {}
         for variable, text_input in self.text_inputs.items():
             if text_input.value_input != "":
                 pvname = f"{self.prefix}:{variable}"
-                self.controller.put(pvname, text_input.value_input)
+                values[pvname] = text_input.value_input
+
+        # apply the configuration as a single batch
+        if values:
+            self.controller.put_many(values)
 
     def clear(self) -> None:
         """
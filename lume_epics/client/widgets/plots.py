@@ -6,8 +6,10 @@ process variables.
 
 from typing import List
 import logging
+import time
 import numpy as np
 
+from bokeh.document import Document
 from bokeh.plotting import figure
 from bokeh.models import ColumnDataSource, ColorMapper, Button
 from bokeh.models.formatters import DatetimeTickFormatter
@@ -15,7 +17,8 @@ from bokeh.models.widgets import Select
 
 from lume_model.variables import Variable, ImageVariable, ScalarVariable
 from lume_epics.client.controller import Controller, DEFAULT_IMAGE_DATA, DEFAULT_SCALAR_VALUE
-from lume_epics.client.monitors import PVImage, PVTimeSeries
+from lume_epics.client.monitors import PVImage, PVTimeSeries, DEFAULT_TIME_SERIES_CAPACITY
+from lume_epics.client.widgets.updates import DocumentUpdater
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +61,7 @@ class ImagePlot:
         prefix: str, 
         x_range: List[float] = None, 
         y_range: List[float] = None,
+        preview: bool = False,
     ) -> None:
         """
         Initialize monitors, current process variable, and data source.
@@ -69,18 +73,28 @@ class ImagePlot:
 
             prefix (str): Prefix used for server
 
+            preview (bool): Display the binned previews served for the images rather 
+                than the full images. Requires a server started with a preview_size.
+
         """
         self.pv_monitors = {}
         self._x_range = x_range
         self._y_range = y_range
 
         for variable in variables:
-            self.pv_monitors[variable.name] = PVImage(prefix, variable, controller)
+            self.pv_monitors[variable.name] = PVImage(
+                prefix, variable, controller, preview=preview
+            )
 
         self.live_variable = list(self.pv_monitors.keys())[0]
 
-        image_data = DEFAULT_IMAGE_DATA
+        # variable and version of the image displayed
+        self._displayed = None
+
+        # display buffers, alternated so that each update assigns a new array
+        self._image_buffers = []
 
+        image_data = {key: list(value) for key, value in DEFAULT_IMAGE_DATA.items()}
         image_data["image"][0] = np.flipud(image_data["image"][0].T)
 
         self.source = ColumnDataSource(image_data)
@@ -157,6 +171,14 @@ class ImagePlot:
         if live_variable:
             self.live_variable = live_variable
 
+        # get image data, skipping images already displayed
+        version, image_data = self.pv_monitors[self.live_variable].poll_with_version()
+        displayed = (self.live_variable, version)
+        if version is not None and displayed == self._displayed:
+            return
+
+        self._displayed = displayed
+
         # update axis and labels
         axis_labels = self.pv_monitors[self.live_variable].axis_labels
         axis_units = self.pv_monitors[self.live_variable].axis_units
@@ -171,12 +193,48 @@ class ImagePlot:
         self.plot.xaxis.axis_label = x_axis_label
         self.plot.yaxis.axis_label = y_axis_label
 
-        # get image data
-        image_data = self.pv_monitors[self.live_variable].poll()
-        image_data["image"][0] = np.flipud(image_data["image"][0].T)
+        image_data["image"][0] = self._display_image(image_data["image"][0])
 
         self.source.data.update(image_data)
 
+    def _display_image(self, image: np.ndarray) -> np.ndarray:
+        """Transposes and flips an image for display into a preallocated buffer.
+
+        Bokeh skips updates to an unchanged data source, so two buffers are 
+        alternated and each update assigns a different array. This also leaves 
+        the previous image untouched while it is being sent to the browser.
+
+        Args:
+            image (np.ndarray): Image array, which is not modified.
+
+        """
+        shape = image.shape[::-1]
+        if len(self._image_buffers) < 2 or any(
+            buffer.shape != shape or buffer.dtype != image.dtype
+            for buffer in self._image_buffers
+        ):
+            self._image_buffers = [
+                np.empty(shape, dtype=image.dtype) for _ in range(2)
+            ]
+
+        self._image_buffers.reverse()
+        buffer = self._image_buffers[0]
+        np.copyto(buffer, np.flipud(image.T))
+
+        return buffer
+
+    def subscribe(self, document: Document = None) -> None:
+        """Update the plot on a bokeh document whenever an image changes, in place of 
+        periodic calls to update.
+
+        Args:
+            document (Document): Bokeh document. Defaults to the current document.
+
+        """
+        self._updater = DocumentUpdater(
+            list(self.pv_monitors.values()), self.update, document
+        )
+
 
 class Striptool:
     """
@@ -207,15 +265,19 @@ class Striptool:
 
             prefix (str): Prefix used for server.
 
-            limit (int): Maximimum steps for striptool to render
+            limit (int): Maximimum steps for striptool to render. Also bounds the 
+                samples held by each monitor.
 
             aspect_ratio (float): Ratio of width to height
 
         """
         self.pv_monitors = {}
+        capacity = DEFAULT_TIME_SERIES_CAPACITY if limit is None else limit
 
         for variable in variables:
-            self.pv_monitors[variable.name] = PVTimeSeries(prefix, variable, controller)
+            self.pv_monitors[variable.name] = PVTimeSeries(
+                prefix, variable, controller, capacity=capacity
+            )
 
         self.live_variable = list(self.pv_monitors.keys())[0]
 
@@ -232,6 +294,12 @@ class Striptool:
             options=list(self.pv_monitors.keys()),
         )
         self.selection.on_change("value", self.update_selection)
+        self._updater = None
+        self._sampling_callback = None
+
+        # sample count of the live variable sent to the data source, None when the 
+        # data source must be replaced
+        self._sent_count = None
         self.build_plot()
 
     def build_plot(self) -> None:
@@ -264,23 +332,77 @@ class Striptool:
     def update(self) -> None:
         """
         Callback to update the plot to reflect updated process variable values or to 
-        display a new process variable.
+        display a new process variable. Only new samples are streamed to the data 
+        source, the data is replaced after the live variable changes or a reset.
+
+        """
 
+        # monitors hold at most limit samples
+        monitor = self.pv_monitors[self.live_variable]
+        ts, ys = monitor.poll()
+
+        # datetime axis expects milliseconds, offset to display local time
+        offset = time.localtime().tm_gmtoff
+
+        n_new = None
+        if self._sent_count is not None:
+            n_new = monitor.count - self._sent_count
+
+        # replace the data when the samples sent are no longer held by the monitor
+        if n_new is None or n_new > len(ts):
+            self.source.data = dict(x=(ts + offset) * 1000, y=ys.copy())
+
+        # otherwise send only the new samples
+        elif n_new:
+            self.source.stream(
+                dict(x=(ts[-n_new:] + offset) * 1000, y=ys[-n_new:].copy()),
+                rollover=monitor.capacity,
+            )
+
+        self._sent_count = monitor.count
+
+    def subscribe(self, document: Document = None, sampling_period: int = 1000) -> None:
+        """Sample the live variable and update the plot on a bokeh document whenever 
+        it changes, in place of periodic calls to update. The live variable is also 
+        sampled periodically, so the plot keeps advancing while its value is constant.
+
+        Args:
+            document (Document): Bokeh document. Defaults to the current document.
+
+            sampling_period (int): Milliseconds between periodic samples. If None, 
+                only changes are plotted.
 
         """
+        if self._updater is not None:
+            self._updater.close()
 
-        ts, ys = self.pv_monitors[self.live_variable].poll()
-        if self._limit is not None and len(ts) > self._limit:
-            ts = ts[-self._limit:]
-            ys = ys[-self._limit:]
+            if self._sampling_callback is not None:
+                self._updater.document.remove_periodic_callback(self._sampling_callback)
+                self._sampling_callback = None
 
-        self.source.data = dict(x=ts, y=ys)
+        self._updater = DocumentUpdater(
+            [self.pv_monitors[self.live_variable]], self.update, document
+        )
+
+        if sampling_period is not None:
+            self._sampling_callback = self._updater.document.add_periodic_callback(
+                self.update, sampling_period
+            )
 
     def update_selection(self, attr, old, new):
         """
         Bokeh callback for assigning new live process variable.
         """
         self.live_variable = new
+        self._sent_count = None
+
+        # follow the new live variable, periodic samples already follow it
+        if self._updater is not None:
+            document = self._updater.document
+            self._updater.close()
+            self._updater = DocumentUpdater(
+                [self.pv_monitors[self.live_variable]], self.update, document
+            )
         
 
     def _reset_values(self) -> None:
@@ -289,3 +411,4 @@ class Striptool:
 
         """
         self.pv_monitors[self.live_variable].reset()
+        self._sent_count = None
@@ -7,11 +7,13 @@ variables.
 from typing import List, Dict
 import logging
 
+from bokeh.document import Document
 from bokeh.models import ColumnDataSource, DataTable, TableColumn, StringFormatter
 
 from lume_model.variables import ScalarVariable
 from lume_epics.client.controller import Controller, DEFAULT_SCALAR_VALUE
 from lume_epics.client.monitors import PVScalar
+from lume_epics.client.widgets.updates import DocumentUpdater
 
 
 class ValueTable:
@@ -21,7 +23,10 @@ class ValueTable:
     Attriibutes:
         _pv_monitors (Dict[str, PVScalar]): Monitors associated with process variables.
 
-        _output_values (dict): Dict mapping process variable name to current value.
+        _output_values (dict): Dict mapping process variable name to current 
+            formatted value.
+
+        _rows (Dict[str, int]): Dict mapping process variable name to table row.
 
         _source (ColumnDataSource): Data source for populating bokeh table.
 
@@ -61,11 +66,7 @@ class ValueTable:
 
         for variable in variables:
             self._pv_monitors[variable.name] = PVScalar(prefix, variable, controller)
-            v = DEFAULT_SCALAR_VALUE
-
-            # format to sig figs
-            v = format(float('{:.{p}g}'.format(v, p=self._sig_figs)))
-            self._output_values[variable.name] = v
+            self._output_values[variable.name] = self._format(DEFAULT_SCALAR_VALUE)
 
             label_base = labels.get(variable.name, variable.name)
 
@@ -76,8 +77,15 @@ class ValueTable:
             else:
                 self._labels[variable.name] = label_base
 
+        self._rows = {name: i for i, name in enumerate(self._output_values)}
+
         self.create_table()
 
+    def _format(self, value: float) -> str:
+        """Format a value to the table significant figures.
+        """
+        return format(float('{:.{p}g}'.format(value, p=self._sig_figs)))
+
     def create_table(self) -> None:
         """
         Creates the bokeh table and populates variable data.
@@ -100,15 +108,28 @@ class ValueTable:
 
     def update(self) -> None:
         """
-        Callback function to update data source to reflect updated values.
+        Callback function to update data source to reflect updated values. Only rows 
+        with a changed formatted value are patched.
         """
+        patches = []
         for variable in self._pv_monitors:
-            v = self._pv_monitors[variable].poll()
+            v = self._format(self._pv_monitors[variable].poll())
 
-            # format to sig figs
-            v = format(float('{:.{p}g}'.format(v, p=self._sig_figs)))
-            self._output_values[variable] = v
+            if v != self._output_values[variable]:
+                self._output_values[variable] = v
+                patches.append((self._rows[variable], v))
 
-        x_vals = [self._labels[var] for var in self._output_values.keys()]
-        y_vals = list(self._output_values.values())
-        self._source.data = dict(x=x_vals, y=y_vals)
+        if patches:
+            self._source.patch({"y": patches})
+
+    def subscribe(self, document: Document = None) -> None:
+        """Update the table on a bokeh document whenever a value changes, in place of 
+        periodic calls to update.
+
+        Args:
+            document (Document): Bokeh document. Defaults to the current document.
+
+        """
+        self._updater = DocumentUpdater(
+            list(self._pv_monitors.values()), self.update, document
+        )
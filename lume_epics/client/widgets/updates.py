@@ -0,0 +1,77 @@
+"""
+The updates module schedules widget updates on a bokeh document when the process
+variables displayed by the widget change, in place of periodic polling.
+
+"""
+import logging
+import threading
+from typing import Callable, List
+
+from bokeh.document import Document
+from bokeh.io import curdoc
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentUpdater:
+    """
+    Subscribes to a set of monitors and schedules a callback on the next tick of a
+    bokeh document whenever any of them changes. Changes arriving before the
+    scheduled callback has run are coalesced into a single update.
+
+    Attributes:
+        document (Document): Bokeh document the updates are scheduled on.
+
+    """
+
+    def __init__(
+        self, monitors: List, callback: Callable, document: Document = None
+    ) -> None:
+        """Subscribe to the monitors.
+
+        Args:
+            monitors (List): Monitors from lume_epics.client.monitors to watch.
+
+            callback (Callable): Widget update executed on the document.
+
+            document (Document): Bokeh document. Defaults to the current document.
+
+        """
+        self.document = document or curdoc()
+        self._monitors = monitors
+        self._callback = callback
+        self._pending = False
+        self._lock = threading.Lock()
+
+        for monitor in self._monitors:
+            monitor.subscribe(self._on_change)
+
+        # release the subscriptions with the session
+        self.document.on_session_destroyed(self._on_session_destroyed)
+
+    def _on_change(self, pvname: str, value) -> None:
+        """Monitor callback, executed on the monitor thread.
+        """
+        with self._lock:
+            if self._pending:
+                return
+
+            self._pending = True
+
+        self.document.add_next_tick_callback(self._update)
+
+    def _update(self) -> None:
+        with self._lock:
+            self._pending = False
+
+        self._callback()
+
+    def _on_session_destroyed(self, session_context) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unsubscribe from the monitors.
+
+        """
+        for monitor in self._monitors:
+            monitor.unsubscribe(self._on_change)
@@ -26,7 +26,8 @@ read_only = args.read_only
 striptool_limit = args.striptool_limit
 ncol_widgets = args.ncol_widgets
 
-layout, callbacks = render_from_yaml(filename, prefix, protocol, read_only=read_only, striptool_limit=striptool_limit, ncol_widgets=ncol_widgets)
+# widgets update when their process variables change
+layout, callbacks = render_from_yaml(filename, prefix, protocol, read_only=read_only, striptool_limit=striptool_limit, ncol_widgets=ncol_widgets, push_updates=True)
 
 
 curdoc().add_root(
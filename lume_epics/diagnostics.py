@@ -0,0 +1,103 @@
+"""
+The diagnostics module collects timing information from
+lume_epics.epics_server.Server. Measurements are recorded into fixed-size windows
+from the comm thread and summarized periodically by a sampler, so recording adds
+only a locked append to the hot path.
+
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+import numpy as np
+
+
+class ServerDiagnostics:
+    """
+    Rolling record of model evaluation durations and of the latencies from input 
+    puts to the hand-off of the resulting outputs to the protocol servers.
+
+    Attributes:
+        window (int): Number of recent measurements used for the statistics.
+
+    """
+
+    def __init__(self, window: int = 1000) -> None:
+        """Initialize empty measurement windows.
+
+        Args:
+            window (int): Number of recent measurements used for the statistics.
+
+        """
+        self.window = window
+        self._evaluation_times = deque(maxlen=window)
+        self._handoff_latencies = deque(maxlen=window)
+        self._last_sample_time = time.monotonic()
+        self._last_evaluations = 0
+        self._lock = threading.Lock()
+
+    def record_evaluation(self, duration: float) -> None:
+        """Record the duration of a model evaluation.
+
+        Args:
+            duration (float): Evaluation duration in seconds.
+
+        """
+        with self._lock:
+            self._evaluation_times.append(duration)
+
+    def record_handoff_latency(self, latency: float) -> None:
+        """Record the time between an input put and the hand-off of the resulting 
+        outputs to the protocol servers. Posting by the protocol servers is not 
+        included.
+
+        Args:
+            latency (float): Latency in seconds.
+
+        """
+        with self._lock:
+            self._handoff_latencies.append(latency)
+
+    def sample(self, evaluations: int) -> Dict[str, float]:
+        """Summarize the recorded measurements.
+
+        Args:
+            evaluations (int): Total number of evaluations completed by the server.
+
+        Returns:
+            Dict[str, float]: Maps statistic name to value.
+
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._last_sample_time
+            rate = (evaluations - self._last_evaluations) / elapsed if elapsed else 0.0
+            self._last_sample_time = now
+            self._last_evaluations = evaluations
+
+            # copied under the lock, as iterating a deque while it is appended raises
+            evaluation_times = np.array(self._evaluation_times)
+            latencies = np.array(self._handoff_latencies)
+
+        statistics = {"EVAL_RATE": rate}
+
+        if evaluation_times.size:
+            statistics.update(
+                {
+                    "EVAL_TIME_LAST": evaluation_times[-1],
+                    "EVAL_TIME_AVG": evaluation_times.mean(),
+                    "EVAL_TIME_P99": np.percentile(evaluation_times, 99),
+                }
+            )
+
+        if latencies.size:
+            statistics.update(
+                {
+                    "HANDOFF_LATENCY_LAST": latencies[-1],
+                    "HANDOFF_LATENCY_AVG": latencies.mean(),
+                    "HANDOFF_LATENCY_P99": np.percentile(latencies, 99),
+                }
+            )
+
+        return {name: float(value) for name, value in statistics.items()}
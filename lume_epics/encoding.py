@@ -0,0 +1,245 @@
+"""
+The encoding module holds the encoding of images published as NTNDArray values by
+the pvAccess server. Images may be cast to a narrower dtype, with the scaling needed
+to restore their values stored as NTNDArray attributes, and compressed into the
+NTNDArray codec fields using the areaDetector codec conventions: the codec
+parameters hold the NDDataType_t code of the uncompressed data.
+
+EncodedNTNDArray decodes both transparently when unwrapping values, and is used by
+lume_epics.client.controller.Controller for all NTNDArray values.
+
+"""
+import zlib
+
+import numpy as np
+from p4p.nt import NTNDArray
+
+try:
+    import lz4.block as lz4_block
+except ImportError:
+    lz4_block = None
+
+try:
+    import blosc
+except ImportError:
+    blosc = None
+
+IMAGE_DTYPES = ("float32", "uint16")
+IMAGE_CODECS = ("lz4", "zlib", "blosc")
+
+# areaDetector NDDataType_t, indexed by code
+ND_DATA_TYPES = [
+    np.dtype(dtype)
+    for dtype in [
+        np.int8,
+        np.uint8,
+        np.int16,
+        np.uint16,
+        np.int32,
+        np.uint32,
+        np.int64,
+        np.uint64,
+        np.float32,
+        np.float64,
+    ]
+]
+
+# attributes restoring the values of a scaled image, value * scale + offset
+SCALE_ATTRIBUTE = "scale"
+OFFSET_ATTRIBUTE = "offset"
+
+
+def _codec_module(codec: str):
+    """Returns the compression module of a codec, raising a ValueError if it is
+    unknown or not installed.
+
+    Args:
+        codec (str): Codec name.
+
+    """
+    if codec not in IMAGE_CODECS:
+        raise ValueError(
+            f"Invalid codec provided: {codec}. Codec options are "
+            f"{', '.join(IMAGE_CODECS)}."
+        )
+
+    module = {"lz4": lz4_block, "zlib": zlib, "blosc": blosc}[codec]
+    if module is None:
+        raise ValueError(f"The {codec} codec requires the {codec} package.")
+
+    return module
+
+
+def compress(data: np.ndarray, codec: str, level: int = None) -> bytes:
+    """Compresses the buffer of a contiguous array.
+
+    Args:
+        data (np.ndarray): Contiguous array.
+
+        codec (str): Codec name, one of IMAGE_CODECS.
+
+        level (int): Compression level of the codec. Uses the codec default if not
+            provided.
+
+    """
+    module = _codec_module(codec)
+
+    if codec == "lz4":
+        # raw block without a size header, as written by areaDetector
+        kwargs = {}
+        if level is not None:
+            kwargs = {"mode": "high_compression", "compression": level}
+
+        return module.compress(data.tobytes(), store_size=False, **kwargs)
+
+    elif codec == "blosc":
+        kwargs = {} if level is None else {"clevel": level}
+
+        return module.compress(data.tobytes(), typesize=data.itemsize, **kwargs)
+
+    return module.compress(data.tobytes(), -1 if level is None else level)
+
+
+def decompress(data: np.ndarray, codec: str, uncompressed_size: int) -> bytes:
+    """Decompresses a buffer compressed with compress.
+
+    Args:
+        data (np.ndarray): Compressed bytes.
+
+        codec (str): Codec name, one of IMAGE_CODECS.
+
+        uncompressed_size (int): Size in bytes of the uncompressed buffer.
+
+    """
+    module = _codec_module(codec)
+
+    if codec == "lz4":
+        return module.decompress(data.tobytes(), uncompressed_size=uncompressed_size)
+
+    return module.decompress(data.tobytes())
+
+
+class EncodedNTNDArray(NTNDArray):
+    """
+    NTNDArray helper publishing images with a narrower dtype and compression. Values
+    of any encoding are decoded on unwrap to the float64 image, or to the published
+    dtype for images that were not scaled.
+
+    Attributes:
+        dtype (str): Published dtype, the image dtype if None.
+
+        codec (str): Compression codec, uncompressed if None.
+
+        level (int): Compression level, the codec default if None.
+
+    """
+
+    def __init__(self, dtype: str = None, codec: str = None, level: int = None, **kws):
+        """Initialize the encoding.
+
+        Args:
+            dtype (str): Published dtype, "float32" or "uint16". Images are scaled
+                to the full uint16 range and the scale and offset restoring their
+                values are published as attributes.
+
+            codec (str): Compression codec, "lz4", "zlib" or "blosc".
+
+            level (int): Compression level of the codec.
+
+        """
+        super().__init__(**kws)
+
+        if dtype is not None and dtype not in IMAGE_DTYPES:
+            raise ValueError(
+                f"Invalid image dtype provided: {dtype}. Dtype options are "
+                f"{', '.join(IMAGE_DTYPES)}."
+            )
+
+        if codec is not None:
+            _codec_module(codec)
+
+        self.dtype = dtype
+        self.codec = codec
+        self.level = level
+
+    def wrap(self, value, **kws):
+        """Wrap an image array, with any attributes, as an encoded NTNDArray Value.
+
+        Args:
+            value (np.ndarray): Image array, with attributes held in attrib if an
+                ntndarray.
+
+        """
+        attrib = dict(getattr(value, "attrib", None) or kws.pop("attrib", None) or {})
+        image = np.asarray(value)
+
+        if self.dtype == "uint16":
+            low, high = 0.0, 0.0
+            if image.size:
+                low, high = float(image.min()), float(image.max())
+
+            scale = (high - low) / np.iinfo(np.uint16).max or 1.0
+            image = np.rint((image - low) / scale).astype(np.uint16)
+            attrib[SCALE_ATTRIBUTE] = scale
+            attrib[OFFSET_ATTRIBUTE] = low
+
+        elif self.dtype == "float32":
+            image = image.astype(np.float32)
+
+        if self.codec is None:
+            return super().wrap(image, attrib=attrib, **kws)
+
+        image = np.ascontiguousarray(image)
+
+        # color mode is deduced from the shape of uncompressed arrays only
+        if "ColorMode" not in attrib:
+            if image.ndim == 2:
+                attrib["ColorMode"] = 0
+
+            elif image.ndim == 3 and 3 in image.shape:
+                attrib["ColorMode"] = 2 + image.shape[::-1].index(3)
+
+        compressed = np.frombuffer(
+            compress(image, self.codec, self.level), dtype=np.uint8
+        )
+        wrapped = super().wrap(compressed, attrib=attrib, **kws)
+        wrapped["codec.name"] = self.codec
+        wrapped["codec.parameters"] = ND_DATA_TYPES.index(image.dtype)
+        wrapped["uncompressedSize"] = image.nbytes
+        wrapped["dimension"] = [
+            {"size": size, "offset": 0, "fullSize": size, "binning": 1, "reverse": False}
+            for size in reversed(image.shape)
+        ]
+
+        return wrapped
+
+    @classmethod
+    def unwrap(klass, value):
+        """Unwrap an NTNDArray Value, decompressing and restoring the scale of
+        encoded images.
+
+        Args:
+            value (Value): NTNDArray Value.
+
+        """
+        codec = value["codec.name"]
+
+        if codec:
+            dtype = ND_DATA_TYPES[value["codec.parameters"]]
+            data = decompress(value.value, codec, value["uncompressedSize"])
+            image = np.frombuffer(data, dtype=dtype).view(klass.ntndarray)
+            image._store(value)
+
+        else:
+            image = super().unwrap(value)
+
+        scale = image.attrib.get(SCALE_ATTRIBUTE)
+        if scale is not None:
+            offset = image.attrib.get(OFFSET_ATTRIBUTE, 0.0)
+            restored = (np.asarray(image, dtype=np.float64) * scale + offset).view(
+                klass.ntndarray
+            )
+            restored.flags.writeable = False
+            image = restored._store(value)
+
+        return image
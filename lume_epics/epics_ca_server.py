@@ -3,16 +3,26 @@ import logging
 import multiprocessing
 import time
 import signal 
+from collections import defaultdict
 from typing import Dict
 
 from lume_model.variables import Variable, InputVariable, OutputVariable
 import numpy as np
-from pcaspy import Driver, SimpleServer
+from pcaspy import Driver, SimpleServer, cas
 from pcaspy.tools import ServerThread
 from queue import Full, Empty, Queue
 
 from typing import Dict, Mapping, Union, List
 
+from .transport import (
+    VariableCodec,
+    WAKE_MESSAGE,
+    SharedImageRing,
+    drain_queue,
+    merge_messages,
+    read_image_slots,
+)
+
 # Each server must have their outQueue in which the comm server will set the inputs and outputs vars to be updated
 # Comm server must also provide one inQueue in which it will receive inputs from Servers
 
@@ -44,6 +54,8 @@ class CAServer(multiprocessing.Process):
                  in_queue: multiprocessing.Queue, 
                  out_queue: multiprocessing.Queue, 
                  running_indicator: multiprocessing.Value,
+                 image_rings: Dict[str, SharedImageRing] = None,
+                 compact_messages: bool = False,
                  *args, **kwargs) -> None:
         """Initialize server process.
 
@@ -58,6 +70,14 @@ class CAServer(multiprocessing.Process):
 
             out_queue (multiprocessing.Queue): Queue for tracking updates to output variables
 
+            running_indicator (multiprocessing.Value): Flag marking the server as running
+
+            image_rings (Dict[str, SharedImageRing]): Shared memory rings holding output 
+                images, mapped by variable name
+
+            compact_messages (bool): Queue messages use the compact VariableCodec 
+                encoding
+
         """
         super().__init__(*args, **kwargs)
         self.ca_server = None
@@ -71,6 +91,10 @@ class CAServer(multiprocessing.Process):
         self._out_queue = out_queue
         self._providers = {}
         self._running = running_indicator
+        self._image_rings = image_rings or {}
+        self._codec = VariableCodec(
+            input_variables, output_variables, compact=compact_messages
+        )
 
 
     def update_pv(self, pvname, value) -> None:
@@ -85,15 +109,19 @@ class CAServer(multiprocessing.Process):
         val = value
         pvname = pvname.replace(f"{self._prefix}:", "")
         self._in_queue.put(
-            {"protocol": self.protocol, "pvname": pvname, "value": val}
+            self._codec.encode_put(self.protocol, pvname, val, time.time())
         )
 
-    def setup_server(self) -> None:
+    def setup_server(self, ignore_interrupt: bool = True) -> None:
         """Configure and start server.
 
+        Args:
+            ignore_interrupt (bool): Ignore keyboard interrupts, as in a subprocess.
+
         """
         # ignore interrupt in subprocess
-        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        if ignore_interrupt:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
 
         logger.info("Initializing CA server")
 
@@ -133,26 +161,62 @@ class CAServer(multiprocessing.Process):
         self.setup_server()
         self._running.value = True
         while not self.exit_event.is_set():
+            # block until updates arrive, then apply everything queued in one pass
             try:
-                data = self._out_queue.get_nowait()
-                inputs = data.get('input_variables', [])
-                outputs = data.get('output_variables', [])
-                self.update_pvs(inputs, outputs)
+                messages = drain_queue(self._out_queue, timeout=0.5)
             except Empty:
-                time.sleep(0.01)
-                logger.debug("out queue empty")
+                continue
+
+            inputs, outputs, image_slots = merge_messages(
+                [
+                    self._codec.decode(message)
+                    for message in messages
+                    if message is not WAKE_MESSAGE
+                ]
+            )
+            outputs += read_image_slots(
+                image_slots, self._image_rings, self._output_variables
+            )
+
+            if inputs or outputs:
+                self.update_pvs(inputs, outputs)
 
         self.server_thread.stop()
+
+        for ring in self._image_rings.values():
+            ring.close()
+
+        # input puts left unread at shutdown must not block the process exit
+        self._in_queue.cancel_join_thread()
+
         self._running.value = False
         logger.info("Channel access server stopped.")
         
 
+    def start_in_process(self) -> None:
+        """Start the server in the calling process. Updates are then applied by 
+        calling update_pvs directly rather than through the output queue.
+
+        """
+        self.setup_server(ignore_interrupt=False)
+        self._running.value = True
+
+    def stop_in_process(self) -> None:
+        """Stop a server started with start_in_process.
+
+        """
+        self.server_thread.stop()
+        self._running.value = False
+
     def shutdown(self):
         """Safely shutdown the server process. 
 
         """
         self.exit_event.set()
 
+        # wake the process if it is waiting on the output queue
+        self._out_queue.put(WAKE_MESSAGE)
+
 
 def build_pvdb(input_variables: List[InputVariable],
                output_variables: List[OutputVariable]) -> tuple:
@@ -243,10 +307,16 @@ def build_pvdb(input_variables: List[InputVariable],
                         "type": "int",
                         "value": color_mode,
                     },
+                    # update counter, must remain the last child so that it is 
+                    # posted after the image data and extents of each update
+                    f"{variable.name}:UniqueId_RBV": {
+                        "type": "int",
+                        "value": 0,
+                    },
                 }
             )
 
-            child_to_parent_map.update({f"{variable.name}:{child}":variable.name for child in ["NDimensions_RBV","Dimensions_RBV", "ArraySizeX_RBV","ArraySizeY_RBV", "ArraySize_RBV", "ArrayData_RBV", "MinX_RBV","MinY_RBV", "MaxX_RBV", "MaxY_RBV", "ColorMode_RBV"]})
+            child_to_parent_map.update({f"{variable.name}:{child}":variable.name for child in ["NDimensions_RBV","Dimensions_RBV", "ArraySizeX_RBV","ArraySizeY_RBV", "ArraySize_RBV", "ArrayData_RBV", "MinX_RBV","MinY_RBV", "MaxX_RBV", "MaxY_RBV", "ColorMode_RBV", "UniqueId_RBV"]})
 
             if "units" in variable.__fields_set__:
                 pvdb[f"{variable.name}:ArrayData_RBV"]["unit"] = variable.units
@@ -284,6 +354,41 @@ class CADriver(Driver):
         super(CADriver, self).__init__()
         self.server = server
 
+        # per image update counters served as <image>:UniqueId_RBV
+        self._image_counters = defaultdict(int)
+
+        # stamp the initial images as a first update
+        variables = {**server._input_variables, **server._output_variables}
+        for variable in variables.values():
+            if variable.variable_type == "image":
+                self._set_image(variable)
+
+    def _set_image(self, variable: Variable) -> None:
+        """Set the process variables of an image update. The children of an update 
+        share a timestamp and are always posted, with the update counter last, so 
+        clients can check that they hold a complete update.
+
+        Args:
+            variable (Variable): Image variable.
+
+        """
+        self._image_counters[variable.name] += 1
+
+        timestamp = cas.epicsTimeStamp()
+        for child, value in [
+            ("ArrayData_RBV", variable.value.flatten()),
+            ("MinX_RBV", variable.x_min),
+            ("MinY_RBV", variable.y_min),
+            ("MaxX_RBV", variable.x_max),
+            ("MaxY_RBV", variable.y_max),
+            ("UniqueId_RBV", self._image_counters[variable.name]),
+        ]:
+            reason = f"{variable.name}:{child}"
+            self.setParam(reason, value, timestamp)
+            param = self.getParamDB(reason)
+            param.mask |= cas.DBE_VALUE | cas.DBE_LOG
+            param.flag = True
+
     def read(self, pvname: str) -> Union[float, np.ndarray]:
         """Method executed by server when clients read a Channel Access process
         variable.
@@ -352,13 +457,7 @@ class CADriver(Driver):
                     logger.debug(
                         "Channel Access image process variable %s updated.",
                         variable.name)
-                    self.setParam(
-                        variable.name + ":ArrayData_RBV", variable.value.flatten()
-                    )
-                    self.setParam(variable.name + ":MinX_RBV", variable.x_min)
-                    self.setParam(variable.name + ":MinY_RBV", variable.y_min)
-                    self.setParam(variable.name + ":MaxX_RBV", variable.x_max)
-                    self.setParam(variable.name + ":MaxY_RBV", variable.y_max)
+                    self._set_image(variable)
 
                 else:
                     logger.debug(
@@ -1,19 +1,32 @@
+import itertools
 import logging
 import multiprocessing
+import threading
 from multiprocessing.managers import DictProxy
 from queue import Full, Empty
 import numpy as np
 import time
 import signal
-from typing import List, Union
+from typing import Dict, List, Union
 
 from lume_model.variables import InputVariable, OutputVariable
-from p4p.nt import NTScalar, NTNDArray
+from p4p import Value
+from p4p.nt import NTScalar, NTNDArray, NTTable
 from p4p.server.thread import SharedPV
 from p4p.server import Server as P4PServer
 from p4p.nt.ndarray import ntndarray as NTNDArrayData
 from p4p.server.raw import ServOpWrap
 
+from .encoding import EncodedNTNDArray
+from .transport import (
+    VariableCodec,
+    WAKE_MESSAGE,
+    SharedImageRing,
+    drain_queue,
+    merge_messages,
+    read_image_slots,
+)
+
 
 # Each server must have their outQueue in which the comm server will set the inputs and outputs vars to be updated
 # Comm server must also provide one inQueue in which it will receive inputs from Servers
@@ -43,6 +56,11 @@ class PVAServer(multiprocessing.Process):
         out_queue: multiprocessing.Queue,
         running_indicator: multiprocessing.Value,
         conf_proxy: DictProxy,
+        image_rings: Dict[str, SharedImageRing] = None,
+        rpc_queue: multiprocessing.Queue = None,
+        rpc_response_queue: multiprocessing.Queue = None,
+        image_encoding: Dict[str, dict] = None,
+        compact_messages: bool = False,
         *args,
         **kwargs,
     ) -> None:
@@ -59,6 +77,24 @@ class PVAServer(multiprocessing.Process):
 
             out_queue (multiprocessing.Queue): Queue for tracking updates to output variables
 
+            running_indicator (multiprocessing.Value): Flag marking the server as running
+
+            conf_proxy (DictProxy): Proxy used to surface the p4p server configuration
+
+            image_rings (Dict[str, SharedImageRing]): Shared memory rings holding output 
+                images, mapped by variable name
+
+            rpc_queue (multiprocessing.Queue): Queue for evaluation requests received 
+                by the <prefix>:EVAL RPC. The RPC is not served if not provided.
+
+            rpc_response_queue (multiprocessing.Queue): Queue for evaluation results
+
+            image_encoding (Dict[str, dict]): Maps output image names to the keyword 
+                arguments of the EncodedNTNDArray publishing the image.
+
+            compact_messages (bool): Queue messages use the compact VariableCodec 
+                encoding
+
         """
 
         super().__init__(*args, **kwargs)
@@ -72,6 +108,16 @@ class PVAServer(multiprocessing.Process):
         self._providers = {}
         self._conf = conf_proxy
         self._running = running_indicator
+        self._image_rings = image_rings or {}
+        self._codec = VariableCodec(
+            input_variables, output_variables, compact=compact_messages
+        )
+        self._rpc_queue = rpc_queue
+        self._rpc_response_queue = rpc_response_queue
+        self._rpc_operations = {}
+        self._rpc_ids = itertools.count()
+        self._rpc_lock = threading.Lock()
+        self._image_encoding = image_encoding or {}
 
     def update_pv(self, pvname: str, value: Union[np.ndarray, float]) -> None:
         """Adds update to input process variable to the input queue.
@@ -85,14 +131,20 @@ class PVAServer(multiprocessing.Process):
         # Hack for now to get the pickable value
         val = value.raw.value
         pvname = pvname.replace(f"{self._prefix}:", "")
-        self._in_queue.put({"protocol": self.protocol, "pvname": pvname, "value": val})
+        self._in_queue.put(
+            self._codec.encode_put(self.protocol, pvname, val, time.time())
+        )
 
-    def setup_server(self) -> None:
+    def setup_server(self, ignore_interrupt: bool = True) -> None:
         """Configure and start server.
 
+        Args:
+            ignore_interrupt (bool): Ignore keyboard interrupts, as in a subprocess.
+
         """
         # ignore interrupt in subprocess
-        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        if ignore_interrupt:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
 
         logger.info("Initializing pvAccess server")
         # initialize global inputs
@@ -145,7 +197,12 @@ class PVAServer(multiprocessing.Process):
                     "y_max": np.float64(variable.y_max),
                 }
 
-                nt = NTNDArray()
+                if variable.name in self._image_encoding:
+                    nt = EncodedNTNDArray(**self._image_encoding[variable.name])
+
+                else:
+                    nt = NTNDArray()
+
                 initial = nd_array
             else:
                 raise ValueError(
@@ -157,6 +214,12 @@ class PVAServer(multiprocessing.Process):
         else:
             pass  # throw exception for incorrect data type
 
+        # batch evaluation, answered from the evaluation results
+        if self._rpc_queue is not None:
+            pvname = f"{self._prefix}:EVAL"
+            self._providers[pvname] = SharedPV(handler=PVAccessEvalHandler(server=self))
+            threading.Thread(target=self._respond_to_evaluations, daemon=True).start()
+
         # initialize pva server
         self.pva_server = P4PServer(providers=[self._providers])
 
@@ -166,6 +229,51 @@ class PVAServer(multiprocessing.Process):
 
         logger.info("pvAccess server started")
 
+    def evaluate(self, columns: Dict[str, np.ndarray], op: ServOpWrap) -> None:
+        """Queues an evaluation requested over RPC. The operation is completed once 
+        the result is returned.
+
+        Args:
+            columns (Dict[str, np.ndarray]): Maps input variable name to the values 
+                of each row.
+
+            op (ServOpWrap): Server operation initiated by the RPC.
+
+        """
+        with self._rpc_lock:
+            request_id = next(self._rpc_ids)
+            self._rpc_operations[request_id] = op
+
+        self._rpc_queue.put((request_id, columns))
+
+    def _respond_to_evaluations(self) -> None:
+        """Completes RPC operations with the evaluation results, executed on a 
+        response thread.
+
+        """
+        while not self.exit_event.is_set():
+            try:
+                request_id, outputs, error = self._rpc_response_queue.get(timeout=0.5)
+            except Empty:
+                continue
+
+            with self._rpc_lock:
+                op = self._rpc_operations.pop(request_id, None)
+
+            if op is None:
+                continue
+
+            if error is not None:
+                op.done(error=error)
+                continue
+
+            try:
+                op.done(build_eval_response(outputs))
+
+            except Exception as e:
+                logger.exception("Unable to build evaluation response.")
+                op.done(error=str(e))
+
     def update_pvs(
         self,
         input_variables: List[InputVariable],
@@ -222,25 +330,62 @@ class PVAServer(multiprocessing.Process):
 
         # mark running
         while not self.exit_event.is_set():
+            # block until updates arrive, then apply everything queued in one pass
             try:
-                data = self._out_queue.get_nowait()
-                inputs = data.get("input_variables", [])
-                outputs = data.get("output_variables", [])
-                self.update_pvs(inputs, outputs)
+                messages = drain_queue(self._out_queue, timeout=0.5)
             except Empty:
-                time.sleep(0.01)
-                logger.debug("out queue empty")
+                continue
+
+            inputs, outputs, image_slots = merge_messages(
+                [
+                    self._codec.decode(message)
+                    for message in messages
+                    if message is not WAKE_MESSAGE
+                ]
+            )
+            outputs += read_image_slots(
+                image_slots, self._image_rings, self._output_variables
+            )
+
+            if inputs or outputs:
+                self.update_pvs(inputs, outputs)
 
         self.pva_server.stop()
+
+        for ring in self._image_rings.values():
+            ring.close()
+
+        # input puts left unread at shutdown must not block the process exit
+        self._in_queue.cancel_join_thread()
+
         self._running.value = False
         logger.info("pvAccess server stopped.")
 
+    def start_in_process(self) -> None:
+        """Start the server in the calling process. Updates are then applied by 
+        calling update_pvs directly rather than through the output queue.
+
+        """
+        self.setup_server(ignore_interrupt=False)
+        self._running.value = True
+
+    def stop_in_process(self) -> None:
+        """Stop a server started with start_in_process.
+
+        """
+        self.exit_event.set()
+        self.pva_server.stop()
+        self._running.value = False
+
     def shutdown(self):
         """Safely shutdown the server process. 
 
         """
         self.exit_event.set()
 
+        # wake the process if it is waiting on the output queue
+        self._out_queue.put(WAKE_MESSAGE)
+
 
 class PVAccessInputHandler:
     """
@@ -280,3 +425,99 @@ class PVAccessInputHandler:
         # mark server operation as complete
         op.done()
 
+
+class PVAccessEvalHandler:
+    """
+    Handler object that defines the callbacks to execute on RPC operations to the 
+    evaluation process variable.
+
+    A request is an NTTable with one column per input variable and one row per 
+    evaluation. A request with the NTURI form sent by pvcall evaluates a single row 
+    from its query arguments.
+    """
+
+    def __init__(self, server: PVAServer):
+        """
+        Initialize the handler.
+
+        Args:
+            server (PVAServer): Reference to the server holding this PV
+
+        """
+        self.server = server
+
+    def rpc(self, pv: SharedPV, op: ServOpWrap) -> None:
+        """Queues the requested rows for evaluation.
+
+        Args:
+            pv (SharedPV): Evaluation process variable.
+
+            op (ServOpWrap): Server operation initiated by the RPC.
+
+        """
+        try:
+            columns = parse_eval_request(op.value())
+
+        except (KeyError, TypeError, ValueError) as e:
+            op.done(error=f"Invalid evaluation request: {e}")
+            return
+
+        self.server.evaluate(columns, op)
+
+
+def parse_eval_request(request: Value) -> Dict[str, np.ndarray]:
+    """Returns the input columns of an evaluation request.
+
+    Args:
+        request (Value): NTTable of input rows, or NTURI with a query of input values.
+
+    """
+    if request.getID().startswith("epics:nt/NTURI"):
+        fields = request["query"].todict() if "query" in request else {}
+
+    else:
+        fields = request["value"].todict()
+
+    return {
+        name: np.atleast_1d(np.asarray(values, dtype=np.float64))
+        for name, values in fields.items()
+    }
+
+
+def build_eval_response(outputs: Dict[str, np.ndarray]) -> Value:
+    """Builds the response to an evaluation request. Scalar outputs are returned as 
+    the columns of an NTTable with one row per evaluation. Image outputs are returned 
+    as NTNDArrays stacking the image of each row along the first axis, under the 
+    images field of the table.
+
+    Args:
+        outputs (Dict[str, np.ndarray]): Maps output variable name to the values of 
+            each row.
+
+    """
+    scalars = {name: values for name, values in outputs.items() if values.ndim == 1}
+    images = {name: values for name, values in outputs.items() if values.ndim > 1}
+
+    extra = []
+    if images:
+        extra = [
+            ("images", ("S", None, [(name, NTNDArray.buildType()) for name in images]))
+        ]
+
+    table_type = NTTable.buildType([(name, "ad") for name in scalars], extra=extra)
+    response = table_type(
+        {
+            "labels": list(scalars),
+            "value": {
+                name: values.astype(np.float64) for name, values in scalars.items()
+            },
+        }
+    )
+
+    # wrap assigns a third dimension to color, so set the dimensions directly
+    for name, values in images.items():
+        image_stack = NTNDArray().wrap(values.ravel())
+        image_stack["dimension"] = [{"size": size} for size in reversed(values.shape)]
+        response[f"images.{name}"] = image_stack
+
+    return response
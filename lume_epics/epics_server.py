@@ -1,19 +1,83 @@
+import copy
 import time
 import logging
 import threading
 import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
 from typing import Dict, Mapping, Union, List
 
 from threading import Thread, Event, local
-from queue import Full, Empty
+from queue import Full, Empty, Queue
 
-from lume_model.variables import Variable, InputVariable, OutputVariable
+import numpy as np
+
+from lume_model.variables import (
+    Variable,
+    InputVariable,
+    OutputVariable,
+    ScalarOutputVariable,
+)
 from lume_model.models import SurrogateModel
 from .epics_pva_server import PVAServer
 from .epics_ca_server import CAServer
+from .transport import SharedImageRing, VariableCodec, write_image_slots
+from .cache import OutputCache
+from .model import OnlineSurrogateModel
+from .images import PREVIEW_METHODS, build_preview, build_statistics
+from .diagnostics import ServerDiagnostics
+from .encoding import EncodedNTNDArray
 
 logger = logging.getLogger(__name__)
 
+# model replica held by each evaluation worker process
+_worker_model = None
+
+
+def _initialize_model_worker(model_class: SurrogateModel, model_kwargs: dict) -> None:
+    """Builds the model replica used by an evaluation worker process.
+
+    Args:
+        model_class (SurrogateModel): Surrogate model class to be instantiated.
+
+        model_kwargs (dict): Kwargs to instantiate model.
+
+    """
+    global _worker_model
+    _worker_model = model_class(**model_kwargs)
+
+
+def _evaluate_in_worker(input_values: Dict[str, Union[float, np.ndarray]]) -> tuple:
+    """Evaluates the worker model replica on a snapshot of input values. Returns the
+    output variables and the evaluation duration in seconds.
+
+    Args:
+        input_values (Dict[str, Union[float, np.ndarray]]): Maps input variable name 
+            to value.
+
+    """
+    input_variables = _worker_model.input_variables
+    for name, value in input_values.items():
+        input_variables[name].value = value
+
+    start = time.perf_counter()
+    predicted_output = _worker_model.evaluate(list(input_variables.values()))
+    return predicted_output, time.perf_counter() - start
+
+
+def _queue_depth(queue: multiprocessing.Queue) -> int:
+    """Returns the approximate number of items on a queue, or -1 where the platform
+    does not support it.
+
+    Args:
+        queue (multiprocessing.Queue): Queue to inspect.
+
+    """
+    try:
+        return queue.qsize()
+    except NotImplementedError:
+        return -1
+
 
 class Server:
     """
@@ -39,6 +103,25 @@ class Server:
 
         exit_event (Event): Threading exit event marking server shutdown.
 
+        input_puts_received (int): Number of input puts received by the comm thread.
+
+        input_puts_merged (int): Number of input puts superseded by a later put to 
+            the same variable before the model was evaluated.
+
+        evaluations (int): Number of completed model evaluations.
+
+        stale_results (int): Number of worker results discarded because a newer 
+            result had already been published.
+
+        outputs_suppressed (int): Number of output variables not published because 
+            their values had not changed.
+
+        diagnostics_thread (Thread): Thread publishing the diagnostic process 
+            variables, if diagnostics are enabled.
+
+        rpc_thread (Thread): Thread evaluating batches requested over the pvAccess 
+            <prefix>:EVAL RPC, if enabled.
+
     """
 
     def __init__(
@@ -47,6 +130,23 @@ class Server:
         prefix: str,
         protocols: List[str] = ["pva", "ca"],
         model_kwargs: dict = {},
+        image_transport: str = "queue",
+        image_ring_slots: int = 4,
+        model_workers: int = None,
+        cache_size: int = None,
+        cache_ttl: float = None,
+        delta_publishing: bool = False,
+        deadband_abs: float = 0.0,
+        deadband_rel: float = 0.0,
+        diagnostics: bool = False,
+        diagnostics_period: float = 1.0,
+        threaded: bool = False,
+        eval_rpc: bool = False,
+        preview_size: int = None,
+        preview_method: str = "mean",
+        image_statistics: List[str] = None,
+        image_encoding: Dict[str, dict] = None,
+        compact_messages: bool = False,
     ) -> None:
         """Create OnlineSurrogateModel instance in the main thread and
         initialize output variables by running with the input process variable
@@ -63,6 +163,69 @@ class Server:
 
             model_kwargs (dict): Kwargs to instantiate model.
 
+            image_transport (str): Transport used to pass output images to the 
+                protocol processes. "queue" pickles images through the output 
+                queues, "shared_memory" places them in shared memory rings and 
+                only queues slot references (requires python >= 3.8).
+
+            image_ring_slots (int): Number of frames held by each shared memory 
+                ring.
+
+            model_workers (int): Number of model replicas evaluated concurrently in 
+                a process pool. If not provided, the model is evaluated in the comm 
+                thread.
+
+            cache_size (int): Maximum size in bytes of the output cache keyed on the 
+                input state. Outputs are not cached if not provided.
+
+            cache_ttl (float): Lifetime of cached outputs in seconds. Cached outputs 
+                do not expire if not provided.
+
+            delta_publishing (bool): Only publish output variables whose values 
+                changed since they were last published. Clients connecting later 
+                receive the last published values.
+
+            deadband_abs (float): Absolute change below which a scalar output is 
+                considered unchanged.
+
+            deadband_rel (float): Change relative to the last published value below 
+                which a scalar output is considered unchanged.
+
+            diagnostics (bool): Serve diagnostic process variables for model 
+                evaluation time, throughput, queue depths and hand-off latency under 
+                <prefix>:SERVER:.
+
+            diagnostics_period (float): Time in seconds between updates of the 
+                diagnostic process variables.
+
+            threaded (bool): Run the Channel Access and pvAccess servers as threads 
+                of the calling process rather than in separate processes. The 
+                protocol servers then share variable state with the server and 
+                receive updates through direct calls instead of queues.
+
+            eval_rpc (bool): Serve a pvAccess RPC process variable <prefix>:EVAL 
+                that evaluates a table of input rows on a separate model instance, 
+                without changing the served input process variables.
+
+            preview_size (int): Maximum width and height of the preview served for 
+                each output image as <prefix>:<name>:Preview. Previews are not 
+                served if not provided.
+
+            preview_method (str): Pooling used to bin preview pixels, "mean" or 
+                "max".
+
+            image_statistics (List[str]): Names of the output images for which the 
+                sum, maximum, centroids, sigmas and projections are served under 
+                <prefix>:<name>:STATS:.
+
+            image_encoding (Dict[str, dict]): Maps output image names to the keyword 
+                arguments of lume_epics.encoding.EncodedNTNDArray, setting the dtype 
+                and compression codec of the image published over pvAccess.
+
+            compact_messages (bool): Encode messages between the server and the 
+                protocol processes with the compact encoding of 
+                lume_epics.transport.VariableCodec rather than queueing pickled 
+                variables.
 
         """
         # check protocol conditions
@@ -75,6 +238,38 @@ class Server:
                 '(pvAccess) and "ca" (Channel Access).'
             )
 
+        if model_workers is not None and model_workers < 1:
+            raise ValueError("Number of model workers must be at least one.")
+
+        if deadband_abs < 0 or deadband_rel < 0:
+            raise ValueError("Deadbands must be non-negative.")
+
+        if image_transport not in ["queue", "shared_memory"]:
+            raise ValueError(
+                'Invalid image transport provided. Transport options are "queue" '
+                'and "shared_memory".'
+            )
+
+        if threaded and image_transport != "queue":
+            raise ValueError(
+                "Image transport cannot be configured for a threaded server."
+            )
+
+        if eval_rpc and "pva" not in protocols:
+            raise ValueError("Evaluation RPC requires the pvAccess protocol.")
+
+        if preview_size is not None and preview_size < 1:
+            raise ValueError("Preview size must be at least one.")
+
+        if image_encoding and "pva" not in protocols:
+            raise ValueError("Image encoding requires the pvAccess protocol.")
+
+        if preview_method not in PREVIEW_METHODS:
+            raise ValueError(
+                f"Invalid preview method provided. Method options are "
+                f"{', '.join(PREVIEW_METHODS)}."
+            )
+
         # need these to be global to access from threads
         self.prefix = prefix
         self.protocols = protocols
@@ -96,13 +291,148 @@ class Server:
             variable.name: variable for variable in self.output_variables
         }
 
-        self.in_queue = multiprocessing.Queue()
+        # threaded servers receive outputs through direct calls
+        self._threaded = threaded
+
+        # the comm and diagnostics threads both send messages
+        self._send_lock = threading.Lock()
         self.out_queues = dict()
-        for protocol in protocols:
-            self.out_queues[protocol] = multiprocessing.Queue()
+        if threaded:
+            self.in_queue = Queue()
+
+        else:
+            self.in_queue = multiprocessing.Queue()
+            for protocol in protocols:
+                self.out_queues[protocol] = multiprocessing.Queue()
+
+        # one shared memory ring per output image, written once for all protocols
+        self._image_rings = {}
+        if image_transport == "shared_memory":
+            for variable in self.output_variables.values():
+                if variable.variable_type == "image":
+                    self._image_rings[variable.name] = SharedImageRing(
+                        variable.value.shape,
+                        variable.value.dtype,
+                        n_slots=image_ring_slots,
+                    )
 
         self.exit_event = Event()
 
+        # track input coalescing
+        self.input_puts_received = 0
+        self.input_puts_merged = 0
+        self.evaluations = 0
+
+        # track pipelined evaluation in the worker pool
+        self._model_workers = model_workers
+        self._executor = None
+        self._evaluation_lock = threading.RLock()
+        self._pending_input = None
+        self._pending_key = None
+        self._pending_put_time = None
+        self._evaluations_in_flight = 0
+        self._submitted_version = 0
+        self._published_version = 0
+        self.stale_results = 0
+
+        # cache outputs on the input state, statistics are served as process variables
+        self._cache = None
+        self._server_variables = {}
+        if cache_size is not None:
+            self._cache = OutputCache(cache_size, ttl=cache_ttl)
+            for statistic in ["CACHE_HITS", "CACHE_MISSES", "CACHE_EVICTIONS",
+                              "CACHE_ENTRIES", "CACHE_BYTES"]:
+                self._add_server_variable(statistic)
+
+        # sample server performance into diagnostic process variables
+        self._diagnostics = None
+        self.diagnostics_thread = None
+        if diagnostics:
+            self._diagnostics = ServerDiagnostics()
+            for statistic in ["EVAL_TIME_LAST", "EVAL_TIME_AVG", "EVAL_TIME_P99",
+                              "EVAL_RATE", "HANDOFF_LATENCY_LAST",
+                              "HANDOFF_LATENCY_AVG", "HANDOFF_LATENCY_P99",
+                              "PUTS_RECEIVED", "PUTS_MERGED",
+                              "IN_QUEUE_DEPTH"]:
+                self._add_server_variable(statistic)
+
+            for protocol in self.out_queues:
+                self._add_server_variable(f"OUT_QUEUE_DEPTH_{protocol.upper()}")
+
+            self.diagnostics_thread = threading.Thread(
+                target=self.run_diagnostics_thread,
+                kwargs={"period": diagnostics_period},
+            )
+
+        # evaluate batches requested over pvAccess with a dedicated model
+        self._rpc_queue = None
+        self._rpc_response_queue = None
+        self.rpc_thread = None
+        if eval_rpc:
+            if threaded:
+                self._rpc_queue = Queue()
+                self._rpc_response_queue = Queue()
+
+            else:
+                self._rpc_queue = multiprocessing.Queue()
+                self._rpc_response_queue = multiprocessing.Queue()
+
+            self.rpc_thread = threading.Thread(
+                target=self.run_rpc_thread,
+                args=(model_class,),
+                kwargs={"model_kwargs": model_kwargs},
+            )
+
+        # track published outputs for delta publishing
+        self._delta_publishing = delta_publishing
+        self._deadband_abs = deadband_abs
+        self._deadband_rel = deadband_rel
+        self._published_outputs = {}
+        self.outputs_suppressed = 0
+        self._changed_outputs(list(self.output_variables.values()))
+
+        image_statistics = image_statistics or []
+        for name in image_statistics:
+            if name not in self.output_variables or \
+                    self.output_variables[name].variable_type != "image":
+                raise ValueError(f"Statistics requested for {name}, which is not an output image.")
+
+        image_encoding = image_encoding or {}
+        for name, encoding in image_encoding.items():
+            if name not in self.output_variables or \
+                    self.output_variables[name].variable_type != "image":
+                raise ValueError(f"Encoding provided for {name}, which is not an output image.")
+
+            # validate the encoding before the server processes start
+            EncodedNTNDArray(**encoding)
+
+        # statistics of the output images, published with the images
+        self._image_statistics = set(image_statistics)
+        self._statistics_variables = {
+            statistic.name: statistic
+            for statistic in self._statistics(list(self.output_variables.values()))
+        }
+
+        # binned previews of the output images, published with the images
+        self._preview_size = preview_size
+        self._preview_method = preview_method
+        self._preview_variables = {}
+        if preview_size is not None:
+            for preview in self._previews(list(self.output_variables.values())):
+                self._preview_variables[preview.name] = preview
+
+        served_output_variables = {
+            **self.output_variables,
+            **self._preview_variables,
+            **self._statistics_variables,
+            **self._server_variables,
+        }
+
+        # protocol servers build the same variable index from these dictionaries
+        self._codec = VariableCodec(
+            self.input_variables, served_output_variables, compact=compact_messages
+        )
+
         self.comm_thread = threading.Thread(
             target=self.run_comm_thread,
             args=(model_class,),
@@ -122,25 +452,37 @@ class Server:
             self.ca_process = CAServer(
                 prefix=self.prefix,
                 input_variables=self.input_variables,
-                output_variables=self.output_variables,
+                output_variables=served_output_variables,
                 in_queue=self.in_queue,
-                out_queue=self.out_queues["ca"],
+                out_queue=self.out_queues.get("ca"),
                 running_indicator=self._ca_running,
+                image_rings=self._image_rings,
+                compact_messages=compact_messages,
             )
 
         # initialize pvAccess server
         if "pva" in protocols:
 
-            manager = multiprocessing.Manager()
-            self._pva_conf = manager.dict()
+            if threaded:
+                self._pva_conf = dict()
+
+            else:
+                manager = multiprocessing.Manager()
+                self._pva_conf = manager.dict()
+
             self.pva_process = PVAServer(
                 prefix=self.prefix,
                 input_variables=self.input_variables,
-                output_variables=self.output_variables,
+                output_variables=served_output_variables,
                 in_queue=self.in_queue,
-                out_queue=self.out_queues["pva"],
+                out_queue=self.out_queues.get("pva"),
                 running_indicator = self._pva_running,
                 conf_proxy = self._pva_conf,
+                image_rings=self._image_rings,
+                rpc_queue=self._rpc_queue,
+                rpc_response_queue=self._rpc_response_queue,
+                image_encoding=image_encoding,
+                compact_messages=compact_messages,
             )
 
     def __enter__(self):
@@ -154,7 +496,17 @@ class Server:
         """
         self.stop()
 
-    def run_comm_thread(self, model_class, model_kwargs={}, in_queue: multiprocessing.Queue=None,
+    def _add_server_variable(self, statistic: str) -> None:
+        """Adds a scalar variable served under <prefix>:SERVER:.
+
+        Args:
+            statistic (str): Name of the statistic.
+
+        """
+        name = f"SERVER:{statistic}"
+        self._server_variables[name] = ScalarOutputVariable(name=name, value=0)
+
+    def run_comm_thread(self, model_class, model_kwargs={}, in_queue: Union[multiprocessing.Queue, Queue]=None,
                         out_queues: Dict[str, multiprocessing.Queue]=None):
         """Handles communications between pvAccess server, Channel Access server, and model.
         
@@ -165,38 +517,537 @@ class Server:
 
             in_queue (multiprocessing.Queue): 
 
-            out_queues (Dict[str: multiprocessing.Queue]): Maps protocol to output assignment queue.
+            out_queues (Dict[str: multiprocessing.Queue]): Maps protocol to output assignment queue. 
+                Empty for a threaded server.
 
 
         """
-        model = model_class(**model_kwargs)
+        model = None
+        if self._model_workers:
+            # replicas are built once per worker and evaluate snapshots concurrently,
+            # spawned as forking the threaded server process can deadlock workers
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._model_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_initialize_model_worker,
+                initargs=(model_class, model_kwargs),
+            )
+        else:
+            model = model_class(**model_kwargs)
 
         while not self.exit_event.is_set():
             try:
-                data = in_queue.get(timeout=0.1)
-                self.input_variables[data["pvname"]].value = data["value"]
-                for protocol, queue in out_queues.items():
-                    if protocol == data["protocol"]:
-                        continue
-                    queue.put(
-                        {"input_variables":
-                            [self.input_variables[data["pvname"]]]
-                        }
-                    )
+                updates = self._drain_in_queue(in_queue)
+                put_time = min(data.get("time", time.time()) for data in updates.values())
+
+                # echo input updates to the protocols that did not receive the put
+                echoed_inputs = {protocol: [] for protocol in self.protocols}
+                for pvname, data in updates.items():
+                    self.input_variables[pvname].value = data["value"]
+                    for protocol in self.protocols:
+                        if protocol != data["protocol"]:
+                            echoed_inputs[protocol].append(
+                                self.input_variables[pvname]
+                            )
+
+                for protocol in self.protocols:
+                    if echoed_inputs[protocol]:
+                        self._send(
+                            {"input_variables": echoed_inputs[protocol]}, [protocol]
+                        )
 
                 # update output variable state
-                model_input = list(self.input_variables.values())
-                predicted_output = model.evaluate(model_input)
-                for protocol, queue in out_queues.items():
-                    queue.put({"output_variables": predicted_output},
-                              timeout=0.1)
+                if self._executor is not None:
+                    with self._evaluation_lock:
+                        key, cached_output = self._lookup_cache()
+
+                        if cached_output is not None:
+                            # a hit supersedes any snapshot waiting for a worker
+                            self._pending_input = None
+                            self._submitted_version += 1
+                            self._published_version = self._submitted_version
+                            self._publish_outputs(cached_output)
+                            self._record_handoff_latency(put_time)
+
+                        else:
+                            self._pending_input = {
+                                name: variable.value
+                                for name, variable in self.input_variables.items()
+                            }
+                            self._pending_key = key
+                            self._pending_put_time = put_time
+                            self._submit_pending_input()
+
+                else:
+                    key, predicted_output = self._lookup_cache()
+
+                    if predicted_output is None:
+                        model_input = list(self.input_variables.values())
+                        start = time.perf_counter()
+                        predicted_output = model.evaluate(model_input)
+                        self._record_evaluation(time.perf_counter() - start)
+
+                        # model may reuse its output variables between evaluations
+                        if key is not None:
+                            self._cache.put(key, copy.deepcopy(predicted_output))
+
+                    self._publish_outputs(predicted_output)
+                    self._record_handoff_latency(put_time)
+
             except Empty:
                 continue
-            except Full:
-                logger.error(f"{protocol} queue is full.")
+
+        if self._executor is not None:
+            with self._evaluation_lock:
+                self._pending_input = None
+
+            self._executor.shutdown(wait=True)
 
         logger.info("Stopping comm thread")
 
+    def _submit_pending_input(self) -> None:
+        """Submits the pending input snapshot to the model workers if a worker is
+        free. Snapshots that arrive while all workers are busy replace one another,
+        so only the newest is evaluated. Must be called holding the evaluation lock.
+
+        """
+        if self._pending_input is None:
+            return
+
+        if self._evaluations_in_flight >= self._model_workers:
+            return
+
+        self._submitted_version += 1
+        self._evaluations_in_flight += 1
+        future = self._executor.submit(_evaluate_in_worker, self._pending_input)
+        self._pending_input = None
+        future.add_done_callback(
+            partial(
+                self._evaluation_done,
+                self._submitted_version,
+                self._pending_key,
+                self._pending_put_time,
+            )
+        )
+
+    def _evaluation_done(self, version: int, key: bytes, put_time: float,
+                         future: Future) -> None:
+        """Callback executed when a worker completes an evaluation. Outputs are only
+        published if no newer snapshot has been published already.
+
+        Args:
+            version (int): Version assigned to the evaluated snapshot.
+
+            key (bytes): Cache key of the evaluated snapshot.
+
+            put_time (float): Time of the oldest input put reflected in the snapshot.
+
+            future (Future): Future holding the evaluation result.
+
+        """
+        with self._evaluation_lock:
+            self._evaluations_in_flight -= 1
+
+            try:
+                predicted_output, duration = future.result()
+            except Exception:
+                logger.exception("Model evaluation %s failed.", version)
+                predicted_output = None
+
+            if predicted_output is not None:
+                self._record_evaluation(duration)
+
+                if key is not None:
+                    self._cache.put(key, predicted_output)
+
+                if version > self._published_version:
+                    self._published_version = version
+                    self._publish_outputs(predicted_output)
+                    self._record_handoff_latency(put_time)
+
+                else:
+                    self.stale_results += 1
+                    logger.debug("Dropping stale result for evaluation %s.", version)
+
+            if not self.exit_event.is_set():
+                self._submit_pending_input()
+
+    def _record_evaluation(self, duration: float) -> None:
+        """Counts a completed model evaluation and records its duration.
+
+        Args:
+            duration (float): Evaluation duration in seconds.
+
+        """
+        self.evaluations += 1
+        if self._diagnostics is not None:
+            self._diagnostics.record_evaluation(duration)
+
+    def _record_handoff_latency(self, put_time: float) -> None:
+        """Records the time from an input put to the hand-off of the resulting 
+        outputs to the protocol servers.
+
+        Args:
+            put_time (float): Time of the input put.
+
+        """
+        if self._diagnostics is not None:
+            self._diagnostics.record_handoff_latency(time.time() - put_time)
+
+    def run_diagnostics_thread(self, period: float = 1.0) -> None:
+        """Periodically publishes the diagnostic process variables.
+
+        Args:
+            period (float): Time in seconds between updates.
+
+        """
+        while not self.exit_event.wait(period):
+            statistics = self._diagnostics.sample(self.evaluations)
+            statistics["PUTS_RECEIVED"] = self.input_puts_received
+            statistics["PUTS_MERGED"] = self.input_puts_merged
+            statistics["IN_QUEUE_DEPTH"] = _queue_depth(self.in_queue)
+
+            for protocol, queue in self.out_queues.items():
+                statistics[f"OUT_QUEUE_DEPTH_{protocol.upper()}"] = _queue_depth(queue)
+
+            variables = []
+            for statistic, value in statistics.items():
+                variable = self._server_variables[f"SERVER:{statistic}"]
+                variable.value = value
+                variables.append(variable.copy())
+
+            self._send({"output_variables": variables})
+
+        logger.info("Stopping diagnostics thread")
+
+    def run_rpc_thread(self, model_class, model_kwargs={}) -> None:
+        """Evaluates batches of input rows requested over the pvAccess evaluation 
+        RPC and returns the outputs to the pvAccess server.
+
+        Args:
+            model_class: Model class to be executed.
+
+            model_kwargs (dict): Dictionary of model keyword arguments.
+
+        """
+        # variables are commonly class attributes of the model, shared with the 
+        # model serving the live inputs
+        model = model_class(**model_kwargs)
+        model.input_variables = copy.deepcopy(model.input_variables)
+        model.output_variables = copy.deepcopy(model.output_variables)
+        model = OnlineSurrogateModel(model)
+
+        while not self.exit_event.is_set():
+            try:
+                request_id, columns = self._rpc_queue.get(timeout=0.5)
+            except Empty:
+                continue
+
+            try:
+                response = (request_id, self._evaluate_batch(model, columns), None)
+
+            # invalid requests
+            except ValueError as e:
+                response = (request_id, None, str(e))
+
+            except Exception as e:
+                logger.exception("Evaluation request %s failed.", request_id)
+                response = (request_id, None, str(e))
+
+            self._rpc_response_queue.put(response)
+
+        logger.info("Stopping RPC thread")
+
+    def _evaluate_batch(
+        self, model: OnlineSurrogateModel, columns: Dict[str, np.ndarray]
+    ) -> Dict[str, np.ndarray]:
+        """Evaluates a model on rows of input values. Inputs without a column take 
+        the current value of the served input variable. Invalid requests raise a 
+        ValueError.
+
+        Args:
+            model (OnlineSurrogateModel): Model instance used for batch evaluation.
+
+            columns (Dict[str, np.ndarray]): Maps input variable name to the values 
+                of each row.
+
+        Returns:
+            Dict[str, np.ndarray]: Maps output variable name to the values of each 
+                row, stacked along the first axis.
+
+        """
+        constant = [
+            name
+            for name in columns
+            if name in self.input_variables and self.input_variables[name].is_constant
+        ]
+        if constant:
+            raise ValueError(
+                f"Constant input variables cannot be set: {', '.join(constant)}."
+            )
+
+        # the batch model fills inputs without a column from its own variables
+        for name, variable in self.input_variables.items():
+            model.model.input_variables[name].value = variable.value
+
+        return model.run_columns(
+            {
+                name: np.asarray(values, dtype=np.float64)
+                for name, values in columns.items()
+            }
+        )
+
+    def _lookup_cache(self) -> tuple:
+        """Looks up outputs for the current input state in the output cache.
+
+        Returns:
+            tuple: Cache key and cached outputs. The key is None if the cache is 
+                disabled and the outputs are None on a miss.
+
+        """
+        if self._cache is None:
+            return None, None
+
+        key = self._cache.key(self.input_variables)
+        return key, self._cache.get(key)
+
+    def _cache_statistics(self) -> List[OutputVariable]:
+        """Updates the cache statistics variables with the current cache state.
+
+        """
+        statistics = {
+            "SERVER:CACHE_HITS": self._cache.hits,
+            "SERVER:CACHE_MISSES": self._cache.misses,
+            "SERVER:CACHE_EVICTIONS": self._cache.evictions,
+            "SERVER:CACHE_ENTRIES": len(self._cache),
+            "SERVER:CACHE_BYTES": self._cache.size,
+        }
+
+        variables = []
+        for name, value in statistics.items():
+            self._server_variables[name].value = value
+            variables.append(self._server_variables[name].copy())
+
+        return variables
+
+    def _publish_outputs(self, predicted_output: List[OutputVariable]) -> None:
+        """Posts model output to the output queue of each protocol.
+
+        Args:
+            predicted_output (List[OutputVariable]): Output variables returned by 
+                the model.
+
+        """
+        if self._cache is not None:
+            predicted_output = predicted_output + self._cache_statistics()
+
+        if self._delta_publishing:
+            predicted_output = self._changed_outputs(predicted_output)
+            if not predicted_output:
+                return
+
+        # previews of the images published
+        if self._preview_size is not None:
+            predicted_output = predicted_output + self._previews(predicted_output)
+
+        # statistics of the images published
+        if self._image_statistics:
+            predicted_output = predicted_output + self._statistics(predicted_output)
+
+        message = {"output_variables": predicted_output}
+        if self._image_rings:
+            queued, image_slots = write_image_slots(
+                predicted_output, self._image_rings
+            )
+            message = {
+                "output_variables": queued,
+                "image_slots": image_slots,
+            }
+
+        self._send(message)
+
+    def _previews(self, output_variables: List[OutputVariable]) -> List[OutputVariable]:
+        """Builds the previews of the image output variables.
+
+        Args:
+            output_variables (List[OutputVariable]): Output variables returned by 
+                the model.
+
+        """
+        return [
+            build_preview(variable, self._preview_size, self._preview_method)
+            for variable in output_variables
+            if variable.variable_type == "image"
+            and variable.name in self.output_variables
+        ]
+
+    def _statistics(self, output_variables: List[OutputVariable]) -> List[OutputVariable]:
+        """Builds the statistics variables of the image output variables configured 
+        for statistics.
+
+        Args:
+            output_variables (List[OutputVariable]): Output variables returned by 
+                the model.
+
+        """
+        statistics = []
+        for variable in output_variables:
+            if variable.name in self._image_statistics:
+                statistics += build_statistics(variable)
+
+        return statistics
+
+    def _send(self, message: dict, protocols: List[str] = None) -> None:
+        """Delivers a message to the protocol servers, either encoded through their 
+        output queues or, for a threaded server, by applying the update directly. 
+        Messages are sent one at a time, as both the comm and diagnostics threads 
+        send.
+
+        Args:
+            message (dict): Message holding input and/or output variables.
+
+            protocols (List[str]): Protocols of the receiving servers. Defaults to 
+                all served protocols.
+
+        """
+        if protocols is None:
+            protocols = self.protocols
+
+        with self._send_lock:
+            if self._threaded:
+                for protocol in protocols:
+                    server = self.ca_process if protocol == "ca" else self.pva_process
+                    server.update_pvs(
+                        message.get("input_variables", []),
+                        message.get("output_variables", []),
+                    )
+
+                return
+
+            # encode once for all queues
+            encoded = self._codec.encode(message)
+            for protocol in protocols:
+                try:
+                    self.out_queues[protocol].put(encoded, timeout=0.1)
+                except Full:
+                    logger.error(f"{protocol} queue is full.")
+
+    def _changed_outputs(self, predicted_output: List[OutputVariable]) -> List[OutputVariable]:
+        """Filters output variables down to those that changed since they were last 
+        published and records their values as published. Images are compared by 
+        value and extents, scalars are compared using the configured deadbands.
+
+        Args:
+            predicted_output (List[OutputVariable]): Output variables returned by 
+                the model.
+
+        """
+        changed = []
+
+        for variable in predicted_output:
+            published = self._published_outputs.get(variable.name)
+
+            if variable.variable_type == "image":
+                state = (
+                    variable.x_min, variable.x_max, variable.y_min, variable.y_max
+                )
+                if (
+                    published is not None
+                    and published["extents"] == state
+                    and np.array_equal(published["value"], variable.value)
+                ):
+                    self.outputs_suppressed += 1
+                    continue
+
+                # model may reuse its output arrays between evaluations
+                self._published_outputs[variable.name] = {
+                    "value": np.array(variable.value, copy=True),
+                    "extents": state,
+                }
+
+            else:
+                if published is not None and self._within_deadband(
+                    published["value"], variable.value
+                ):
+                    self.outputs_suppressed += 1
+                    continue
+
+                self._published_outputs[variable.name] = {"value": variable.value}
+
+            changed.append(variable)
+
+        return changed
+
+    def _within_deadband(self, published: float, value: float) -> bool:
+        """Checks whether a scalar value is within the deadband of the last 
+        published value.
+
+        Args:
+            published (float): Last published value.
+
+            value (float): New value.
+
+        """
+        if published is None or value is None:
+            return published is value
+
+        tolerance = self._deadband_abs + self._deadband_rel * abs(published)
+        return abs(value - published) <= tolerance
+
+    def _drain_in_queue(self, in_queue: multiprocessing.Queue,
+                        timeout: float = 0.1) -> Dict[str, dict]:
+        """Waits for an input update, then collects every update already pending on
+        the queue. Updates are merged per process variable so that the last write
+        wins and a single model evaluation serves the whole batch.
+
+        Args:
+            in_queue (multiprocessing.Queue): Queue holding input updates.
+
+            timeout (float): Time in seconds to wait for the first update.
+
+        Returns:
+            Dict[str, dict]: Maps variable name to its most recent update.
+
+        Raises:
+            Empty: No update was received before the timeout.
+
+        """
+        data = self._codec.decode_put(in_queue.get(timeout=timeout))
+        updates = {data["pvname"]: data}
+        received = 1
+
+        while True:
+            try:
+                data = self._codec.decode_put(in_queue.get_nowait())
+            except Empty:
+                break
+
+            updates[data["pvname"]] = data
+            received += 1
+
+        self.input_puts_received += received
+        self.input_puts_merged += received - len(updates)
+
+        if received > len(updates):
+            logger.debug(
+                "Merged %s input puts into %s updates.", received, len(updates)
+            )
+
+        return updates
+
+    def _protocol_processes(self) -> list:
+        """Returns the started protocol server processes.
+
+        """
+        processes = []
+        if "ca" in self.protocols:
+            processes.append(self.ca_process)
+
+        if "pva" in self.protocols:
+            processes.append(self.pva_process)
+
+        return [process for process in processes if process.is_alive()]
+
     def start(self, monitor: bool = True) -> None:
         """Starts server using set server protocol(s).
 
@@ -208,11 +1059,25 @@ class Server:
         """
         self.comm_thread.start()
 
+        if self.diagnostics_thread is not None:
+            self.diagnostics_thread.start()
+
+        if self.rpc_thread is not None:
+            self.rpc_thread.start()
+
         if "ca" in self.protocols:
-            self.ca_process.start()
+            if self._threaded:
+                self.ca_process.start_in_process()
+
+            else:
+                self.ca_process.start()
 
         if "pva" in self.protocols:
-            self.pva_process.start()
+            if self._threaded:
+                self.pva_process.start_in_process()
+
+            else:
+                self.pva_process.start()
 
         if monitor:
             try:
@@ -230,10 +1095,40 @@ class Server:
         self.exit_event.set()
         self.comm_thread.join()
 
+        if self.diagnostics_thread is not None:
+            self.diagnostics_thread.join()
+
+        if self.rpc_thread is not None:
+            self.rpc_thread.join()
+
         if "ca" in self.protocols:
-            self.ca_process.shutdown()
+            if self._threaded:
+                self.ca_process.stop_in_process()
+
+            else:
+                self.ca_process.shutdown()
             
         if "pva" in self.protocols:
-            self.pva_process.shutdown()
+            if self._threaded:
+                self.pva_process.stop_in_process()
+
+            else:
+                self.pva_process.shutdown()
+
+        # outputs left unread at shutdown must not block the process exit
+        for queue in self.out_queues.values():
+            queue.cancel_join_thread()
+
+        if self._rpc_response_queue is not None and not self._threaded:
+            self._rpc_response_queue.cancel_join_thread()
+
+        # release shared memory once the consumers are done
+        if self._image_rings:
+            for protocol_process in self._protocol_processes():
+                protocol_process.join(timeout=5)
+
+            for ring in self._image_rings.values():
+                ring.close()
+                ring.unlink()
 
         logger.info("Server is stopped.")
\ No newline at end of file
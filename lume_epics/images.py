@@ -0,0 +1,193 @@
+"""
+The images module holds vectorized reductions of model output images, computed by
+the server once per evaluation and published alongside the full images.
+
+"""
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+from lume_model.variables import ImageOutputVariable, ScalarOutputVariable
+
+PREVIEW_METHODS = ("mean", "max")
+
+# scalar image statistics, served as <name>:STATS:<statistic>
+STATISTICS = ("SUM", "MAX", "CENTROID_X", "CENTROID_Y", "SIGMA_X", "SIGMA_Y")
+
+
+def bin_image(
+    image: np.ndarray, max_size: int, method: str = "mean"
+) -> Tuple[np.ndarray, Tuple[float, float]]:
+    """Bins an image to at most max_size pixels along each axis by pooling blocks of
+    pixels. Pixels beyond the last whole block of an axis are dropped.
+
+    Args:
+        image (np.ndarray): Image array, with any color dimension last.
+
+        max_size (int): Maximum number of binned pixels along each axis.
+
+        method (str): Pooling of each block, "mean" or "max".
+
+    Returns:
+        Tuple[np.ndarray, Tuple[float, float]]: Binned image and the fraction of each
+            axis covered by the binned pixels.
+
+    """
+    factors = [math.ceil(size / max_size) for size in image.shape[:2]]
+    if factors == [1, 1]:
+        return image, (1.0, 1.0)
+
+    n_blocks = [size // factor for size, factor in zip(image.shape[:2], factors)]
+    trimmed = image[: n_blocks[0] * factors[0], : n_blocks[1] * factors[1]]
+    blocks = trimmed.reshape(
+        n_blocks[0], factors[0], n_blocks[1], factors[1], *image.shape[2:]
+    )
+
+    if method == "max":
+        binned = blocks.max(axis=(1, 3))
+
+    else:
+        binned = blocks.mean(axis=(1, 3))
+
+    coverage = tuple(
+        n * factor / size
+        for n, factor, size in zip(n_blocks, factors, image.shape[:2])
+    )
+
+    return binned, coverage
+
+
+def build_preview(
+    variable: ImageOutputVariable, max_size: int, method: str = "mean"
+) -> ImageOutputVariable:
+    """Builds the preview of an image output variable, named <name>:Preview, holding
+    the binned image and the extents covered by the binned pixels.
+
+    Args:
+        variable (ImageOutputVariable): Image output variable.
+
+        max_size (int): Maximum number of preview pixels along each axis.
+
+        method (str): Pooling of each block of pixels, "mean" or "max".
+
+    """
+    binned, (coverage_x, coverage_y) = bin_image(
+        np.asarray(variable.value), max_size, method
+    )
+
+    return variable.copy(
+        update={
+            "name": f"{variable.name}:Preview",
+            "value": binned,
+            "x_max": variable.x_min + (variable.x_max - variable.x_min) * coverage_x,
+            "y_max": variable.y_min + (variable.y_max - variable.y_min) * coverage_y,
+        }
+    )
+
+
+def image_statistics(
+    image: np.ndarray, x_min: float, x_max: float, y_min: float, y_max: float
+) -> Tuple[Dict[str, float], np.ndarray, np.ndarray]:
+    """Computes the statistics of an image with pixels spanning the given extents. 
+    The first image axis is x and color channels are summed.
+
+    Args:
+        image (np.ndarray): Image array.
+
+        x_min (float): Lower edge of the first pixel along x.
+
+        x_max (float): Upper edge of the last pixel along x.
+
+        y_min (float): Lower edge of the first pixel along y.
+
+        y_max (float): Upper edge of the last pixel along y.
+
+    Returns:
+        Tuple[Dict[str, float], np.ndarray, np.ndarray]: Scalar statistics keyed by 
+            the names in STATISTICS, and the projections of the image onto x and y. 
+            Centroids and sigmas are nan for an image summing to zero.
+
+    """
+    image = np.asarray(image, dtype=np.float64)
+    if image.ndim > 2:
+        image = image.sum(axis=tuple(range(2, image.ndim)))
+
+    projection_x = image.sum(axis=1)
+    projection_y = image.sum(axis=0)
+    total = projection_x.sum()
+
+    statistics = {"SUM": total, "MAX": image.max()}
+
+    for axis, projection, low, high in [
+        ("X", projection_x, x_min, x_max),
+        ("Y", projection_y, y_min, y_max),
+    ]:
+        # pixel centers
+        pixel_size = (high - low) / projection.size
+        positions = low + (np.arange(projection.size) + 0.5) * pixel_size
+
+        if total != 0:
+            centroid = projection @ positions / total
+            variance = projection @ (positions - centroid) ** 2 / total
+            sigma = math.sqrt(max(variance, 0.0))
+
+        else:
+            centroid = sigma = math.nan
+
+        statistics[f"CENTROID_{axis}"] = centroid
+        statistics[f"SIGMA_{axis}"] = sigma
+
+    statistics = {name: float(value) for name, value in statistics.items()}
+
+    return statistics, projection_x, projection_y
+
+
+def build_statistics(variable: ImageOutputVariable) -> List:
+    """Builds the statistics variables of an image output variable. Scalar 
+    statistics are named <name>:STATS:<statistic>. The projections onto x and y are 
+    images of a single column named <name>:STATS:PROJECTION_X and PROJECTION_Y, with 
+    extents along the projected axis.
+
+    Args:
+        variable (ImageOutputVariable): Image output variable.
+
+    """
+    statistics, projection_x, projection_y = image_statistics(
+        variable.value, variable.x_min, variable.x_max, variable.y_min, variable.y_max
+    )
+
+    variables = [
+        ScalarOutputVariable(name=f"{variable.name}:STATS:{name}", value=value)
+        for name, value in statistics.items()
+    ]
+
+    axis_labels = variable.axis_labels or ["x", "y"]
+    axis_units = variable.axis_units
+
+    for axis, projection, low, high, labels, units in [
+        ("X", projection_x, variable.x_min, variable.x_max, axis_labels, axis_units),
+        (
+            "Y",
+            projection_y,
+            variable.y_min,
+            variable.y_max,
+            axis_labels[::-1],
+            axis_units[::-1] if axis_units else axis_units,
+        ),
+    ]:
+        variables.append(
+            variable.copy(
+                update={
+                    "name": f"{variable.name}:STATS:PROJECTION_{axis}",
+                    "value": projection[:, np.newaxis],
+                    "x_min": low,
+                    "x_max": high,
+                    "y_min": 0,
+                    "y_max": 1,
+                    "axis_labels": labels,
+                    "axis_units": units,
+                }
+            )
+        )
+
+    return variables
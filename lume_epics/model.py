@@ -6,9 +6,12 @@ using the OnlineSurrogateModel class.
 
 """
 
+import copy
 import numpy as np
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Tuple, Mapping, Union, List
 from abc import ABC, abstractmethod
 
@@ -71,3 +74,159 @@ class OnlineSurrogateModel:
         logger.info("Ellapsed time: %s", str(t2 - t1))
 
         return list(self.output_variables.values())
+
+    def run_batch(
+        self,
+        inputs: np.ndarray,
+        images: Dict[str, np.ndarray] = None,
+        input_names: List[str] = None,
+        workers: int = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Executes the model on a batch of input rows. Returns the outputs column 
+        oriented, mapping each output variable name to the values of every row 
+        stacked along the first axis.
+
+        Args:
+            inputs (np.ndarray): Array of shape (N, n_inputs) holding the scalar input 
+                values of each row.
+
+            images (Dict[str, np.ndarray]): Maps image input variable name to an array 
+                of shape (N, ny, nx) stacking the image of each row.
+
+            input_names (List[str]): Names of the input variables in the columns of 
+                inputs. Defaults to the scalar input variables of the model, in order.
+
+            workers (int): Number of threads evaluating rows in parallel for models 
+                without an evaluate_batch method.
+
+        """
+        if input_names is None:
+            input_names = [
+                name
+                for name, variable in self.model.input_variables.items()
+                if variable.variable_type == "scalar"
+            ]
+
+        inputs = np.asarray(inputs, dtype=np.float64)
+        if inputs.ndim != 2 or inputs.shape[1] != len(input_names):
+            raise ValueError(f"Inputs must have shape (N, {len(input_names)}).")
+
+        input_values = {name: inputs[:, i] for i, name in enumerate(input_names)}
+        if images:
+            input_values.update(images)
+
+        return self.run_columns(input_values, workers=workers)
+
+    def run_columns(
+        self, input_values: Dict[str, np.ndarray], workers: int = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Executes the model on a batch of input rows given as columns. Inputs without 
+        a column take the current value of the model input variable.
+
+        Models defining evaluate_batch(input_values) evaluate every row in a single 
+        call, taking a dict mapping input variable name to an array with one entry 
+        per row and returning outputs in the same form. Other models are evaluated 
+        row by row, in parallel on copies of the model if workers is provided.
+
+        Args:
+            input_values (Dict[str, np.ndarray]): Maps input variable name to the 
+                values of each row, stacked along the first axis.
+
+            workers (int): Number of threads evaluating rows in parallel for models 
+                without an evaluate_batch method. The model must support deepcopy.
+
+        """
+        unknown = set(input_values) - set(self.model.input_variables)
+        if unknown:
+            raise ValueError(f"Unknown input variables: {', '.join(sorted(unknown))}.")
+
+        n_rows = {len(values) for values in input_values.values()}
+        if len(n_rows) > 1:
+            raise ValueError("Input columns must have the same length.")
+
+        n_rows = n_rows.pop() if n_rows else 1
+
+        input_values = dict(input_values)
+        for name, variable in self.model.input_variables.items():
+            if name not in input_values:
+                value = variable.value if variable.value is not None else variable.default
+                value = np.asarray(value)
+                input_values[name] = np.broadcast_to(value, (n_rows,) + value.shape)
+
+        if hasattr(self.model, "evaluate_batch"):
+            return {
+                name: np.asarray(values)
+                for name, values in self.model.evaluate_batch(input_values).items()
+            }
+
+        if workers is None or workers == 1:
+            # rows set the model variables, so evaluate on copies of them
+            replica = _replicate(self.model)
+            results = [
+                _evaluate_row(replica, input_values, row) for row in range(n_rows)
+            ]
+
+        else:
+            # each thread uses its own copy of the model and its variables
+            replicas = threading.local()
+
+            def evaluate(row):
+                if not hasattr(replicas, "model"):
+                    replicas.model = _replicate(self.model, deep=True)
+
+                return _evaluate_row(replicas.model, input_values, row)
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(evaluate, range(n_rows)))
+
+        if not results:
+            return {}
+
+        return {
+            name: np.stack([result[name] for result in results]) for name in results[0]
+        }
+
+
+def _replicate(model: SurrogateModel, deep: bool = False) -> SurrogateModel:
+    """Copies a model with instance level copies of its input and output variables. 
+    Variables are commonly class attributes of the model, shared by every instance 
+    and by copy.deepcopy of the instance.
+
+    Args:
+        model (SurrogateModel): Model to copy.
+
+        deep (bool): Deep copy the model state besides the variables.
+
+    """
+    replica = copy.deepcopy(model) if deep else copy.copy(model)
+    replica.input_variables = copy.deepcopy(model.input_variables)
+    replica.output_variables = copy.deepcopy(model.output_variables)
+
+    return replica
+
+
+def _evaluate_row(
+    model: SurrogateModel, input_values: Dict[str, np.ndarray], row: int
+) -> Dict[str, np.ndarray]:
+    """Evaluates a model on one row of a batch.
+
+    Args:
+        model (SurrogateModel): Model to evaluate.
+
+        input_values (Dict[str, np.ndarray]): Maps input variable name to the values 
+            of each row.
+
+        row (int): Index of the row.
+
+    """
+    for name, variable in model.input_variables.items():
+        value = input_values[name][row]
+        variable.value = value.item() if np.ndim(value) == 0 else value
+
+    return {
+        # model may reuse its output arrays between evaluations
+        variable.name: np.array(variable.value, copy=True)
+        for variable in model.evaluate(list(model.input_variables.values()))
+    }
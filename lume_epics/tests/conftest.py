@@ -1,3 +1,4 @@
+import copy
 import logging
 import pytest
 import sys
@@ -105,6 +106,20 @@ def model():
     yield TestModel
 
 
+@pytest.fixture
+def isolated_model(model):
+    """
+    Subclass of the test model with its own variables. Variables are class 
+    attributes of the test model, updated by servers running in the test process.
+    """
+
+    class IsolatedModel(model):
+        input_variables = copy.deepcopy(model.input_variables)
+        output_variables = copy.deepcopy(model.output_variables)
+
+    yield IsolatedModel
+
+
 @pytest.fixture(scope="session", autouse=True)
 def prefix():
     yield "test"
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from lume_epics.client.buffers import TimeSeriesBuffer
+
+
+def test_time_series_buffer_append():
+    buffer = TimeSeriesBuffer(4)
+    for i in range(3):
+        buffer.append(float(i), i * 2.0)
+
+    times, data = buffer.view()
+    assert list(times) == [0.0, 1.0, 2.0]
+    assert list(data) == [0.0, 2.0, 4.0]
+
+
+@pytest.mark.parametrize("n_samples", [(5), (11)])
+def test_time_series_buffer_wraps(n_samples):
+    buffer = TimeSeriesBuffer(4)
+    for i in range(n_samples):
+        buffer.append(float(i), float(i))
+
+    times, data = buffer.view()
+    assert len(buffer) == 4
+    assert buffer.count == n_samples
+    assert list(times) == [float(i) for i in range(n_samples - 4, n_samples)]
+
+    # ordered samples are a view of the buffer
+    assert np.shares_memory(data, buffer._data)
+
+
+def test_time_series_buffer_clear():
+    buffer = TimeSeriesBuffer(2)
+    buffer.append(0.0, None)
+    assert np.isnan(buffer.view()[1][0])
+
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.count == 0
+    assert buffer.view()[0].size == 0
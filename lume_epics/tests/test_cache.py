@@ -0,0 +1,91 @@
+import time
+import numpy as np
+import pytest
+
+from lume_model.variables import (
+    ScalarInputVariable,
+    ScalarOutputVariable,
+    ImageOutputVariable,
+)
+from lume_epics.cache import OutputCache
+
+
+@pytest.fixture(scope="module")
+def outputs():
+    return [ScalarOutputVariable(name="output1", value=2.0)]
+
+
+def test_cache_key_tracks_image_buffers(model):
+    input_variables = {
+        name: variable.copy(deep=True) for name, variable in model.input_variables.items()
+    }
+    for variable in input_variables.values():
+        variable.value = variable.default
+
+    key = OutputCache.key(input_variables)
+    assert key == OutputCache.key(input_variables)
+
+    input_variables["input3"].value = input_variables["input3"].value * 2
+    assert key != OutputCache.key(input_variables)
+
+
+def test_cache_hit_and_miss(outputs):
+    cache = OutputCache(1024)
+    key = OutputCache.key({"input1": ScalarInputVariable(name="input1", default=1.0, value=1.0, range=[0, 5])})
+
+    assert cache.get(key) is None
+    cache.put(key, outputs)
+    assert cache.get(key) == outputs
+
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_key_numeric_types(outputs):
+    cache = OutputCache(1024)
+    variable = ScalarInputVariable(name="input1", default=1.0, range=[0, 5])
+
+    keys = []
+    for value in [1.0, 1, np.float64(1.0)]:
+        variable.value = value
+        keys.append(OutputCache.key({"input1": variable}))
+
+    cache.put(keys[0], outputs)
+    assert all(cache.get(key) == outputs for key in keys)
+    assert cache.hits == 3
+
+
+@pytest.mark.parametrize("n_entries", [(3), (10)])
+def test_cache_eviction(n_entries, outputs):
+    # room for two entries
+    cache = OutputCache(2 * OutputCache._estimate_size(outputs))
+
+    for i in range(n_entries):
+        cache.put(str(i).encode(), outputs)
+
+    assert len(cache) == 2
+    assert cache.evictions == n_entries - 2
+    assert cache.size <= cache.max_bytes
+    assert cache.get(str(n_entries - 1).encode()) is not None
+    assert cache.get(b"0") is None
+
+
+def test_cache_ttl(outputs):
+    cache = OutputCache(1024, ttl=0.05)
+    cache.put(b"key", outputs)
+    assert cache.get(b"key") is not None
+
+    time.sleep(0.1)
+    assert cache.get(b"key") is None
+    assert cache.evictions == 1
+    assert len(cache) == 0
+
+
+def test_cache_skips_large_outputs():
+    cache = OutputCache(1024)
+    output = ImageOutputVariable(
+        name="output3", axis_labels=["count_1", "count_2"], value=np.zeros((32, 32))
+    )
+
+    cache.put(b"key", [output])
+    assert len(cache) == 0
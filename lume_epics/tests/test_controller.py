@@ -0,0 +1,191 @@
+import threading
+import time
+
+import numpy as np
+
+from lume_epics.client.controller import (
+    Controller,
+    acquire_controller,
+    release_controller,
+)
+from lume_epics.epics_server import Server
+
+
+def test_controller_subscribe(controller, prefix, server):
+    received = []
+    updated = threading.Event()
+
+    def callback(pvname, value):
+        received.append(value)
+        if value == 3.0:
+            updated.set()
+
+    pvname = f"{prefix}:output1"
+    controller.subscribe(pvname, callback)
+    controller.put(f"{prefix}:input1", 1.5)
+    assert updated.wait(5)
+
+    # no further calls once unsubscribed
+    controller.unsubscribe(pvname, callback)
+    n_received = len(received)
+    controller.put(f"{prefix}:input1", 2.0)
+    time.sleep(1)
+    assert len(received) == n_received
+
+
+def test_controller_put_get_many(controller, prefix, server):
+    pvnames = [f"{prefix}:input1", f"{prefix}:missing"]
+
+    status = controller.put_many({pvnames[0]: 4.0, pvnames[1]: 1.0}, timeout=0.5)
+    assert status == {pvnames[0]: True, pvnames[1]: False}
+
+    values = controller.get_many(pvnames, timeout=0.5)
+    assert values[pvnames[0]] == 4.0
+    assert values[pvnames[1]] is None
+
+
+def test_controller_put_get_many_pva(isolated_model):
+    server = Server(isolated_model, "many", protocols=["pva"], threaded=True)
+    server.start(monitor=False)
+    controller = Controller("pva", server.input_variables, server.output_variables, "many")
+
+    try:
+        pvnames = ["many:input1", "many:missing"]
+
+        status = controller.put_many({pvnames[0]: 4.0, pvnames[1]: 1.0}, timeout=2)
+        assert status == {pvnames[0]: True, pvnames[1]: False}
+
+        values = controller.get_many(pvnames, timeout=2)
+        assert values[pvnames[0]] == 4.0
+        assert values[pvnames[1]] is None
+
+    finally:
+        controller.close()
+        server.stop()
+
+
+def test_controller_image_snapshot_cached(controller, prefix, server):
+    pvname = f"{prefix}:output3"
+    controller.get_image(pvname)
+
+    # allow the image monitors to connect
+    time.sleep(1)
+
+    image_data = controller.get_image(pvname)
+    assert image_data["image"][0] is controller.get_image(pvname)["image"][0]
+
+    version, image_data = controller.get_image_with_version(pvname)
+    assert version == controller.get_image_with_version(pvname)[0]
+    assert not image_data["image"][0].flags.writeable
+
+
+def test_shared_controller(model, prefix, protocol, server):
+    args = (protocol, model.input_variables, model.output_variables, prefix)
+    controller = acquire_controller(*args)
+    assert acquire_controller(*args) is controller
+
+    # closed once released by every caller
+    release_controller(controller)
+    assert acquire_controller(*args) is controller
+    release_controller(controller)
+    release_controller(controller)
+
+    shared = acquire_controller(*args)
+    assert shared is not controller
+    release_controller(shared)
+
+
+def test_shared_controller_concurrent(model, prefix, protocol, server):
+    args = (protocol, model.input_variables, model.output_variables, prefix)
+    start = threading.Barrier(4)
+    controllers = []
+
+    def acquire():
+        start.wait()
+        controllers.append(acquire_controller(*args))
+
+    threads = [threading.Thread(target=acquire) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    # a single controller is kept, counted once per caller
+    assert all(controller is controllers[0] for controller in controllers)
+    for controller in controllers[:-1]:
+        release_controller(controller)
+
+    assert acquire_controller(*args) is controllers[0]
+    release_controller(controllers[0])
+    release_controller(controllers[0])
+
+
+def test_controller_waits_for_monitor_creation(controller, prefix, server):
+    pvname = f"{prefix}:input1"
+    registered = controller._pv_registry.pop(pvname)
+    received = []
+
+    # a value arrives before the monitor is registered
+    with controller._monitor_lock:
+        controller._pv_registry[pvname] = {"pv": None, "value": 1.0}
+        reader = threading.Thread(target=lambda: received.append(controller.get(pvname)))
+        reader.start()
+        time.sleep(0.2)
+        assert not received
+
+        controller._pv_registry[pvname] = registered
+
+    reader.join()
+    assert received == [registered["value"]]
+
+
+def test_controller_history(model, prefix, protocol, server):
+    controller = Controller(
+        protocol, model.input_variables, model.output_variables, prefix,
+        history_capacity=100,
+    )
+    pvname = f"{prefix}:output1"
+
+    # allow the monitors to connect
+    time.sleep(1)
+    since = time.time()
+
+    for value in [0.5, 1.0, 1.5]:
+        controller.put(f"{prefix}:input1", value)
+        time.sleep(0.2)
+
+    times, values = controller.history(pvname, since=since)
+    assert list(values) == [1.0, 2.0, 3.0]
+    assert all(times > since)
+
+    times, values = controller.history(pvname, max_points=1)
+    assert list(values) == [3.0]
+
+    controller.close()
+
+
+def test_controller_history_disconnect(prefix, protocol, server):
+    controller = Controller(protocol, {}, {}, prefix, history_capacity=10)
+    pvname = f"{prefix}:history"
+    controller._pv_registry[pvname] = {"pv": None, "value": None}
+
+    controller._ca_value_callback(pvname, 1.0, timestamp=100.0)
+    controller._ca_connection_callback(pvname=pvname, conn=False, pv=None)
+    controller._ca_value_callback(pvname, 2.0, timestamp=101.0)
+
+    # disconnects take the last server timestamp
+    times, values = controller.history(pvname)
+    assert list(times) == [100.0, 100.0, 101.0]
+    assert np.isnan(values[1])
+
+    times, values = controller.history(pvname, since=100.0)
+    assert list(values) == [2.0]
+
+    # timestamps stay ordered when a server clock steps back
+    controller._ca_value_callback(pvname, 3.0, timestamp=99.0)
+    times, values = controller.history(pvname, since=100.5)
+    assert list(times) == [101.0, 101.0]
+    assert list(values) == [2.0, 3.0]
+
+    controller.close()
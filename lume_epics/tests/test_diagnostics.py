@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+from p4p.client.thread import Context
+
+from lume_epics.diagnostics import ServerDiagnostics
+from lume_epics.epics_server import Server
+
+
+def test_diagnostics_sample():
+    diagnostics = ServerDiagnostics(window=3)
+
+    # no measurements yet
+    assert set(diagnostics.sample(0)) == {"EVAL_RATE"}
+
+    for duration in [1.0, 2.0, 3.0, 4.0]:
+        diagnostics.record_evaluation(duration)
+        diagnostics.record_handoff_latency(duration / 10)
+
+    statistics = diagnostics.sample(4)
+    assert statistics["EVAL_TIME_LAST"] == 4.0
+    assert statistics["EVAL_TIME_AVG"] == 3.0
+    assert statistics["HANDOFF_LATENCY_LAST"] == pytest.approx(0.4)
+    assert statistics["EVAL_RATE"] > 0
+
+
+def test_diagnostics_sample_while_recording():
+    diagnostics = ServerDiagnostics(window=100)
+    diagnostics.record_evaluation(0.01)
+    stop = threading.Event()
+
+    def record():
+        while not stop.is_set():
+            diagnostics.record_evaluation(0.01)
+            diagnostics.record_handoff_latency(0.001)
+
+    record_thread = threading.Thread(target=record)
+    record_thread.start()
+
+    try:
+        for i in range(1000):
+            statistics = diagnostics.sample(i)
+
+    finally:
+        stop.set()
+        record_thread.join()
+
+    assert statistics["EVAL_TIME_AVG"] == pytest.approx(0.01)
+
+
+def test_diagnostics_process_variables(isolated_model):
+    server = Server(
+        isolated_model,
+        "diagnostics",
+        protocols=["pva"],
+        threaded=True,
+        diagnostics=True,
+        diagnostics_period=0.1,
+    )
+    server.start(monitor=False)
+    context = Context("pva")
+
+    try:
+        context.put("diagnostics:input1", 3.0, timeout=5)
+        time.sleep(0.5)
+
+        assert context.get("diagnostics:SERVER:PUTS_RECEIVED", timeout=5) >= 1
+        assert context.get("diagnostics:SERVER:EVAL_TIME_LAST", timeout=5) > 0
+        assert context.get("diagnostics:SERVER:HANDOFF_LATENCY_LAST", timeout=5) > 0
+
+    finally:
+        context.close()
+        server.stop()
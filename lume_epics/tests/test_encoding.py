@@ -0,0 +1,87 @@
+import time
+
+import numpy as np
+import pytest
+from p4p.client.thread import Context
+from p4p.nt.ndarray import ntndarray
+
+from lume_epics import encoding
+from lume_epics.client.controller import Controller
+from lume_epics.encoding import EncodedNTNDArray
+from lume_epics.epics_server import Server
+
+
+CODEC_MODULES = {"lz4": encoding.lz4_block, "zlib": encoding.zlib, "blosc": encoding.blosc}
+
+
+def codec_param(codec):
+    return pytest.param(
+        codec,
+        marks=pytest.mark.skipif(
+            CODEC_MODULES[codec] is None, reason=f"{codec} is not installed"
+        ),
+    )
+
+
+@pytest.mark.parametrize(
+    "codec", [None, codec_param("zlib"), codec_param("lz4"), codec_param("blosc")]
+)
+@pytest.mark.parametrize("dtype,tolerance", [(None, 0), ("float32", 1e-6), ("uint16", 1e-3)])
+def test_encoding_round_trip(dtype, tolerance, codec):
+    image = np.linspace(0, 10, 12).reshape(4, 3).view(ntndarray)
+    image.attrib = {"x_min": 0.0, "x_max": 1.0}
+
+    value = EncodedNTNDArray(dtype=dtype, codec=codec).wrap(image)
+    decoded = EncodedNTNDArray.unwrap(value)
+
+    assert decoded.shape == (4, 3)
+    assert decoded.attrib["x_max"] == 1.0
+    assert np.allclose(decoded, image, rtol=0, atol=tolerance)
+    assert not decoded.flags.writeable
+
+    if codec is not None:
+        assert value["codec.name"] == codec
+        itemsize = 2 if dtype == "uint16" else decoded.itemsize
+        assert value["uncompressedSize"] == decoded.size * itemsize
+
+
+def test_encoding_invalid():
+    with pytest.raises(ValueError):
+        EncodedNTNDArray(dtype="int8")
+
+    with pytest.raises(ValueError):
+        EncodedNTNDArray(codec="jpeg")
+
+
+def test_server_encoding(model):
+    with pytest.raises(ValueError):
+        Server(model, "encoding", protocols=["pva"], image_encoding={"output1": {}})
+
+    server = Server(
+        model,
+        "encoding",
+        protocols=["pva"],
+        threaded=True,
+        image_encoding={"output3": {"dtype": "uint16", "codec": "zlib"}},
+    )
+    server.start(monitor=False)
+
+    try:
+        output = server.output_variables["output3"]
+        controller = Controller(
+            "pva", server.input_variables, server.output_variables, "encoding"
+        )
+        controller.get_image("encoding:output3")
+        time.sleep(1)
+
+        image = controller.get_image("encoding:output3")["image"][0]
+        assert np.allclose(image, output.value, rtol=0, atol=1e-3)
+        controller.close()
+
+        # published compressed
+        context = Context("pva", nt=False)
+        assert context.get("encoding:output3", timeout=5)["codec.name"] == "zlib"
+        context.close()
+
+    finally:
+        server.stop()
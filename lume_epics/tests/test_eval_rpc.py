@@ -0,0 +1,90 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+from p4p.client.thread import Context, RemoteError
+from p4p.nt import NTTable, NTNDArray
+
+from lume_epics.epics_server import Server
+
+
+@pytest.fixture
+def rpc_server(isolated_model):
+    server = Server(
+        isolated_model, "rpc", protocols=["pva"], eval_rpc=True, threaded=True
+    )
+    server.start(monitor=False)
+
+    yield server
+
+    server.stop()
+
+
+@pytest.fixture
+def context():
+    context = Context("pva")
+
+    yield context
+
+    context.close()
+
+
+def test_eval_rpc(rpc_server, context):
+    request = NTTable.buildType([("input1", "ad")])(
+        {"labels": ["input1"], "value": {"input1": np.array([0.5, 1.0, 2.0])}}
+    )
+    response = context.rpc("rpc:EVAL", request, timeout=5)
+
+    assert list(response["value.output1"]) == [1.0, 2.0, 4.0]
+    assert NTNDArray.unwrap(response["images.output3"]).shape == (3, 2, 2)
+
+    # served inputs are unchanged
+    assert context.get("rpc:input1", timeout=5) == 1.0
+
+
+def test_eval_rpc_during_puts(rpc_server, context):
+    values = np.linspace(0.0, 5.0, 256)
+    request = NTTable.buildType([("input1", "ad")])(
+        {"labels": ["input1"], "value": {"input1": values}}
+    )
+
+    def put():
+        for value in [0.5, 1.5, 2.5, 3.5]:
+            context.put("rpc:input1", value, timeout=5)
+            time.sleep(0.05)
+
+    put_thread = threading.Thread(target=put)
+    put_thread.start()
+    for _ in range(4):
+        response = context.rpc("rpc:EVAL", request, timeout=5)
+        assert np.array_equal(response["value.output1"], values * 2)
+
+    put_thread.join()
+    time.sleep(0.5)
+
+    # served variables hold the last live put, not the rows of the batch
+    assert rpc_server.input_variables["input1"].value == 3.5
+    assert context.get("rpc:input1", timeout=5) == 3.5
+    assert context.get("rpc:output1", timeout=5) == 7.0
+
+
+def test_eval_rpc_unknown_input(rpc_server, context):
+    request = NTTable.buildType([("missing", "ad")])(
+        {"labels": ["missing"], "value": {"missing": np.array([1.0])}}
+    )
+
+    with pytest.raises(RemoteError):
+        context.rpc("rpc:EVAL", request, timeout=5)
+
+
+def test_eval_rpc_ragged_columns(rpc_server, context):
+    request = NTTable.buildType([("input1", "ad"), ("input3", "ad")])(
+        {
+            "labels": ["input1", "input3"],
+            "value": {"input1": np.array([1.0, 2.0]), "input3": np.array([1.0])},
+        }
+    )
+
+    with pytest.raises(RemoteError):
+        context.rpc("rpc:EVAL", request, timeout=5)
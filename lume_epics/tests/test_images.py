@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from lume_model.variables import ImageOutputVariable
+
+from lume_epics.images import bin_image, build_preview, build_statistics, image_statistics
+
+
+@pytest.mark.parametrize(
+    "method,expected", [("mean", [[2.5, 4.5], [10.5, 12.5]]), ("max", [[5, 7], [13, 15]])]
+)
+def test_bin_image(method, expected):
+    image = np.arange(16).reshape(4, 4)
+    binned, coverage = bin_image(image, 2, method)
+
+    assert np.array_equal(binned, expected)
+    assert coverage == (1.0, 1.0)
+
+
+def test_build_preview():
+    variable = ImageOutputVariable(
+        name="image",
+        value=np.ones((10, 5)),
+        axis_labels=["x", "y"],
+        x_min=0,
+        x_max=10,
+        y_min=0,
+        y_max=5,
+    )
+    preview = build_preview(variable, 4)
+
+    # blocks of 3 x 2 pixels drop the last pixel of each axis
+    assert preview.name == "image:Preview"
+    assert preview.value.shape == (3, 2)
+    assert preview.x_max == 9
+    assert preview.y_max == 4
+
+
+def test_image_statistics():
+    # single column of pixels with centers at x = 1, 3 and unit width in y
+    image = np.array([[1.0], [3.0]])
+    statistics, projection_x, projection_y = image_statistics(image, 0, 4, 0, 1)
+
+    assert statistics["SUM"] == 4
+    assert statistics["MAX"] == 3
+    assert statistics["CENTROID_X"] == pytest.approx(2.5)
+    assert statistics["SIGMA_X"] == pytest.approx(np.sqrt(0.75))
+    assert statistics["CENTROID_Y"] == pytest.approx(0.5)
+    assert statistics["SIGMA_Y"] == 0
+    assert np.array_equal(projection_x, [1, 3])
+    assert np.array_equal(projection_y, [4])
+
+    statistics, _, _ = image_statistics(np.zeros((2, 2)), 0, 1, 0, 1)
+    assert np.isnan(statistics["CENTROID_X"])
+
+
+def test_build_statistics():
+    variable = ImageOutputVariable(
+        name="image",
+        value=np.ones((4, 2)),
+        axis_labels=["x", "y"],
+        x_min=0,
+        x_max=4,
+        y_min=-1,
+        y_max=1,
+    )
+    statistics = {variable.name: variable for variable in build_statistics(variable)}
+
+    assert statistics["image:STATS:SUM"].value == 8
+    assert statistics["image:STATS:CENTROID_X"].value == pytest.approx(2)
+    assert statistics["image:STATS:CENTROID_Y"].value == pytest.approx(0)
+
+    projection_y = statistics["image:STATS:PROJECTION_Y"]
+    assert projection_y.value.shape == (2, 1)
+    assert (projection_y.x_min, projection_y.x_max) == (-1, 1)
+    assert projection_y.axis_labels == ["y", "x"]
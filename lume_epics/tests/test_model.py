@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from lume_epics.model import OnlineSurrogateModel
+
+
+@pytest.fixture(scope="module")
+def online_model(model):
+    return OnlineSurrogateModel(model())
+
+
+@pytest.mark.parametrize("workers", [(None), (2)])
+def test_run_batch(online_model, workers):
+    inputs = np.array([[0.5], [1.0], [2.0]])
+    outputs = online_model.run_batch(inputs, input_names=["input1"], workers=workers)
+
+    assert list(outputs["output1"]) == [1.0, 2.0, 4.0]
+    assert outputs["output3"].shape == (3, 2, 2)
+
+
+@pytest.mark.parametrize("workers", [(None), (2)])
+def test_run_batch_leaves_variables(online_model, workers):
+    inputs = online_model.model.input_variables
+    outputs = online_model.model.output_variables
+    input_value = inputs["input1"].value
+    output_value = outputs["output1"].value
+
+    online_model.run_batch(
+        np.array([[3.0], [4.0]]), input_names=["input1"], workers=workers
+    )
+    assert inputs["input1"].value == input_value
+    assert outputs["output1"].value == output_value
+
+
+def test_run_batch_parallel_rows(online_model):
+    inputs = np.linspace(0.0, 5.0, 64).reshape(-1, 1)
+    outputs = online_model.run_batch(inputs, input_names=["input1"], workers=4)
+
+    assert np.array_equal(outputs["output1"], inputs[:, 0] * 2)
+
+
+def test_run_batch_leaves_inputs_on_error(model):
+    class FailingModel(model):
+        def evaluate(self, input_variables):
+            if input_variables[0].value > 10:
+                raise ValueError("Out of range.")
+
+            return super().evaluate(input_variables)
+
+    online_model = OnlineSurrogateModel(FailingModel())
+    value = online_model.model.input_variables["input1"].value
+
+    with pytest.raises(ValueError):
+        online_model.run_batch(np.array([[3.0], [20.0]]), input_names=["input1"])
+
+    assert online_model.model.input_variables["input1"].value == value
+
+
+def test_run_batch_images(online_model):
+    images = np.stack([np.full((2, 2), value) for value in [1.0, 2.0]])
+    outputs = online_model.run_batch(
+        np.array([[1.0], [1.0]]), images={"input3": images}, input_names=["input1"]
+    )
+
+    assert np.array_equal(outputs["output3"], images * 2)
+
+
+def test_run_batch_shape(online_model):
+    with pytest.raises(ValueError):
+        online_model.run_batch(np.ones((3, 2)), input_names=["input1"])
+
+
+def test_run_batch_evaluate_batch(model):
+    class BatchModel(model):
+        def evaluate_batch(self, input_values):
+            return {"output1": input_values["input1"] * 2}
+
+    outputs = OnlineSurrogateModel(BatchModel()).run_batch(
+        np.array([[1.0], [3.0]]), input_names=["input1"]
+    )
+    assert list(outputs["output1"]) == [2.0, 6.0]
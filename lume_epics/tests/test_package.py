@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+def imported_max_array_bytes(env):
+    return subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            "import os, lume_epics; print(os.environ['EPICS_CA_MAX_ARRAY_BYTES'])",
+        ],
+        env=env,
+    ).decode().strip()
+
+
+@pytest.mark.parametrize("value,expected", [(None, "1000000"), ("50000000", "50000000")])
+def test_ca_max_array_bytes(value, expected):
+    env = {
+        key: item for key, item in os.environ.items() if key != "EPICS_CA_MAX_ARRAY_BYTES"
+    }
+    if value is not None:
+        env["EPICS_CA_MAX_ARRAY_BYTES"] = value
+
+    # a limit set by the user is kept
+    assert imported_max_array_bytes(env) == expected
@@ -6,6 +6,8 @@ import os
 import sys
 import epics
 import signal
+import threading
+from concurrent.futures import Future
 from epicscorelibs.path import get_lib
 from p4p.client.thread import Context
 from p4p import cleanup
@@ -99,4 +101,245 @@ def test_constant_variable_pva(value, prefix, server, model):
             else:
                 assert val == value
 
-    ctxt.close()
\ No newline at end of file
+    ctxt.close()
+
+
+@pytest.fixture
+def delta_server(model):
+    # threaded server with Channel Access only, never started
+    server = epics_server.Server(
+        model,
+        "delta",
+        protocols=["ca"],
+        threaded=True,
+        delta_publishing=True,
+        deadband_abs=0.1,
+        deadband_rel=0.01,
+    )
+
+    return server
+
+
+def test_delta_publishing_scalars(delta_server):
+    output = delta_server.output_variables["output1"]
+    published = output.value
+
+    # the outputs of the initial evaluation count as published
+    assert delta_server._changed_outputs([output]) == []
+    assert delta_server.outputs_suppressed == 1
+
+    # within deadband_abs + deadband_rel * abs(published)
+    tolerance = 0.1 + 0.01 * abs(published)
+    within = output.copy(update={"value": published + 0.99 * tolerance})
+    assert delta_server._changed_outputs([within]) == []
+
+    beyond = output.copy(update={"value": published + 2 * tolerance})
+    assert delta_server._changed_outputs([beyond]) == [beyond]
+    assert delta_server.outputs_suppressed == 2
+
+    # compared against the last published value
+    assert delta_server._changed_outputs([output]) == [output]
+
+
+def test_delta_publishing_first_publish(delta_server):
+    variable = ScalarOutputVariable(name="new_output", value=1.0)
+
+    assert delta_server._changed_outputs([variable]) == [variable]
+    assert delta_server._changed_outputs([variable]) == []
+
+
+def test_delta_publishing_images(delta_server):
+    output = delta_server.output_variables["output3"]
+    suppressed = delta_server.outputs_suppressed
+    assert delta_server._changed_outputs([output]) == []
+
+    # arrays reused by the model are compared against the published copy
+    value = np.array(output.value, copy=True)
+    image = output.copy(update={"value": value})
+    value += 1
+    assert delta_server._changed_outputs([image]) == [image]
+    assert delta_server._changed_outputs([image]) == []
+
+    moved = image.copy(update={"x_max": image.x_max + 1})
+    assert delta_server._changed_outputs([moved]) == [moved]
+    assert delta_server.outputs_suppressed == suppressed + 2
+
+
+def test_delta_publishing_disabled(model):
+    server = epics_server.Server(model, "nodelta", protocols=["ca"], threaded=True)
+    sent = []
+    server._send = lambda message, protocols=None: sent.append(message)
+
+    server._publish_outputs(list(server.output_variables.values()))
+    server._publish_outputs(list(server.output_variables.values()))
+
+    assert len(sent) == 2
+    assert server.outputs_suppressed == 0
+
+
+class ManualExecutor:
+    """Executor holding submitted snapshots until the test completes them."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, input_values):
+        future = Future()
+        self.submitted.append((input_values, future))
+        return future
+
+
+@pytest.fixture
+def pool_server(model):
+    server = epics_server.Server(
+        model, "pool", protocols=["ca"], threaded=True, model_workers=2
+    )
+    server._executor = ManualExecutor()
+    server.published = []
+    server._publish_outputs = server.published.append
+
+    return server
+
+
+def submit_input(server, value):
+    with server._evaluation_lock:
+        server._pending_input = {"input1": value}
+        server._pending_key = None
+        server._pending_put_time = time.time()
+        server._submit_pending_input()
+
+
+def result(value):
+    return [ScalarOutputVariable(name="output1", value=value)], 0.01
+
+
+def test_pool_discards_stale_result(pool_server):
+    submit_input(pool_server, 1.0)
+    submit_input(pool_server, 2.0)
+    (_, first), (_, second) = pool_server._executor.submitted
+
+    # the newer snapshot completes first
+    second.set_result(result(4.0))
+    first.set_result(result(2.0))
+
+    assert [outputs[0].value for outputs in pool_server.published] == [4.0]
+    assert pool_server.stale_results == 1
+
+
+def test_pool_submits_latest_pending(pool_server):
+    pool_server._model_workers = 1
+    submit_input(pool_server, 1.0)
+
+    # snapshots arriving while the worker is busy replace one another
+    submit_input(pool_server, 2.0)
+    submit_input(pool_server, 3.0)
+    assert len(pool_server._executor.submitted) == 1
+
+    pool_server._executor.submitted[0][1].set_result(result(2.0))
+
+    submitted = [values["input1"] for values, _ in pool_server._executor.submitted]
+    assert submitted == [1.0, 3.0]
+    assert pool_server._pending_input is None
+
+
+def test_pool_recovers_from_model_error(pool_server):
+    pool_server._model_workers = 1
+    submit_input(pool_server, 1.0)
+    submit_input(pool_server, 2.0)
+
+    pool_server._executor.submitted[0][1].set_exception(ValueError("model failed"))
+
+    # the pending snapshot is submitted once the failed evaluation completes
+    assert pool_server._evaluations_in_flight == 1
+    assert len(pool_server._executor.submitted) == 2
+
+    pool_server._executor.submitted[1][1].set_result(result(4.0))
+    assert [outputs[0].value for outputs in pool_server.published] == [4.0]
+    assert pool_server._evaluations_in_flight == 0
+
+
+def test_pool_spawned_workers(model):
+    # workers import the model class, so the module level test model is used
+    server = epics_server.Server(
+        model, "spawn", protocols=["ca"], threaded=True, model_workers=2
+    )
+    published = []
+    server._publish_outputs = published.append
+    value = server.input_variables["input1"].value
+
+    server.in_queue.put(server._codec.encode_put("ca", "input1", 3.0, time.time()))
+    comm_thread = threading.Thread(
+        target=server.run_comm_thread,
+        args=(model,),
+        kwargs={"in_queue": server.in_queue},
+    )
+    comm_thread.start()
+
+    try:
+        deadline = time.time() + 30
+        while not published and time.time() < deadline:
+            time.sleep(0.1)
+
+    finally:
+        server.exit_event.set()
+        comm_thread.join()
+        server.input_variables["input1"].value = value
+
+    assert server._executor._mp_context.get_start_method() == "spawn"
+
+    outputs = {variable.name: variable for variable in published[0]}
+    assert outputs["output1"].value == 6.0
+
+
+def test_merged_input_puts(isolated_model):
+    server = epics_server.Server(isolated_model, "merge", protocols=["ca"], threaded=True)
+    published = []
+    server._publish_outputs = published.append
+
+    image = np.array([[2, 2], [2, 2]])
+    for pvname, value in [("input1", 1.0), ("input3", image), ("input1", 2.0), ("input1", 4.0)]:
+        server.in_queue.put(server._codec.encode_put("ca", pvname, value, time.time()))
+
+    comm_thread = threading.Thread(
+        target=server.run_comm_thread,
+        args=(isolated_model,),
+        kwargs={"in_queue": server.in_queue},
+    )
+    comm_thread.start()
+    time.sleep(0.5)
+    server.exit_event.set()
+    comm_thread.join()
+
+    # a single evaluation of the latest values
+    assert server.evaluations == 1
+    assert server.input_puts_received == 4
+    assert server.input_puts_merged == 2
+
+    outputs = {variable.name: variable for variable in published[0]}
+    assert outputs["output1"].value == 8.0
+    assert (outputs["output3"].value == image * 2).all()
+
+
+def test_threaded_server(isolated_model):
+    server = epics_server.Server(isolated_model, "threaded", threaded=True)
+    server.start(monitor=False)
+    context = Context("pva")
+
+    try:
+        # puts over either protocol update the outputs served over both
+        epics.caput("threaded:input1", 2.0, wait=True, timeout=5)
+        time.sleep(0.5)
+        assert epics.caget("threaded:output1", timeout=5) == 4.0
+        assert context.get("threaded:output1", timeout=5) == 4.0
+
+        context.put("threaded:input1", 3.0, timeout=5)
+        time.sleep(0.5)
+        assert context.get("threaded:output1", timeout=5) == 6.0
+        assert epics.caget("threaded:output1", timeout=5) == 6.0
+        assert epics.caget("threaded:input1", timeout=5) == 3.0
+
+    finally:
+        context.close()
+        server.stop()
+
+    assert not server.comm_thread.is_alive()
@@ -0,0 +1,172 @@
+import multiprocessing
+import pickle
+import time
+import numpy as np
+import pytest
+
+from lume_model.variables import (
+    ScalarInputVariable,
+    ScalarOutputVariable,
+    ImageOutputVariable,
+)
+from lume_epics import transport
+from lume_epics.transport import (
+    WAKE_MESSAGE,
+    SharedImageRing,
+    VariableCodec,
+    drain_queue,
+    merge_messages,
+    read_image_slots,
+    write_image_slots,
+)
+
+
+@pytest.mark.skipif(transport.shared_memory is None, reason="Requires python >= 3.8")
+def test_shared_image_ring_overwrite():
+    ring = SharedImageRing((4, 3), np.float64, n_slots=2)
+    image = np.random.uniform(0, 256, size=(4, 3))
+
+    slot, seq = ring.write(image)
+    assert (ring.read(slot, seq) == image).all()
+
+    # frame is overwritten once the ring wraps
+    ring.write(image)
+    ring.write(image)
+    assert ring.read(slot, seq) is None
+
+    ring.close()
+    ring.unlink()
+
+
+@pytest.mark.skipif(transport.shared_memory is None, reason="Requires python >= 3.8")
+def test_shared_image_ring_round_trip():
+    ring = SharedImageRing((4, 3), np.float64, n_slots=2)
+    image = np.random.uniform(0, 256, size=(4, 3))
+    slot, seq = ring.write(image)
+
+    # consumers attach to the same block when the ring is pickled
+    attached = pickle.loads(pickle.dumps(ring))
+    assert attached.name == ring.name
+    frame = attached.read(slot, seq)
+    assert (frame == image).all()
+
+    # reads are copies, unaffected by later writes to the slot
+    ring.write(image)
+    ring.write(np.zeros((4, 3)))
+    assert (frame == image).all()
+
+    attached.close()
+    ring.close()
+    ring.unlink()
+
+
+@pytest.mark.skipif(transport.shared_memory is None, reason="Requires python >= 3.8")
+def test_shared_image_ring_torn_read():
+    producer = SharedImageRing((4, 3), np.float64, n_slots=2)
+    consumer = pickle.loads(pickle.dumps(producer))
+    slot, seq = producer.write(np.ones((4, 3)))
+
+    # the producer wraps around onto the slot while the consumer copies it
+    view_slot = consumer._slot
+
+    def overwritten_slot(index):
+        producer.write(np.zeros((4, 3)))
+        producer.write(np.zeros((4, 3)))
+        return view_slot(index)
+
+    consumer._slot = overwritten_slot
+    assert consumer.read(slot, seq) is None
+
+    consumer.close()
+    producer.close()
+    producer.unlink()
+
+
+@pytest.mark.skipif(transport.shared_memory is None, reason="Requires python >= 3.8")
+def test_read_image_slots_skips_overwritten():
+    variable = ImageOutputVariable(
+        name="image",
+        value=np.zeros((4, 3)),
+        axis_labels=["x", "y"],
+        x_min=0,
+        x_max=1,
+        y_min=0,
+        y_max=1,
+    )
+    ring = SharedImageRing((4, 3), np.float64, n_slots=2)
+    rings = {"image": ring}
+
+    _, stale_slots = write_image_slots([variable], rings)
+    _, image_slots = write_image_slots([variable], rings)
+    write_image_slots([variable], rings)
+
+    variables = read_image_slots(
+        stale_slots + image_slots, rings, {"image": variable}
+    )
+    assert len(variables) == 1
+    assert (variables[0].value == variable.value).all()
+
+    ring.close()
+    ring.unlink()
+
+
+def test_drain_queue():
+    queue = multiprocessing.Queue()
+    for i in range(5):
+        queue.put(i)
+
+    # allow the feeder thread to flush
+    time.sleep(0.5)
+    assert drain_queue(queue, timeout=1) == list(range(5))
+
+
+def test_merge_messages_last_value_wins():
+    messages = [
+        {"output_variables": [ScalarOutputVariable(name="output1", value=1.0)]},
+        WAKE_MESSAGE,
+        {"output_variables": [ScalarOutputVariable(name="output1", value=2.0)]},
+        {"image_slots": [{"name": "output3", "slot": 0, "seq": 1}]},
+        {"image_slots": [{"name": "output3", "slot": 1, "seq": 2}]},
+    ]
+
+    inputs, outputs, image_slots = merge_messages(messages)
+
+    assert inputs == []
+    assert [variable.value for variable in outputs] == [2.0]
+    assert [image_slot["seq"] for image_slot in image_slots] == [2]
+
+
+@pytest.mark.parametrize("compact", [(True), (False)])
+def test_variable_codec_round_trip(compact):
+    input_variables = {
+        "input1": ScalarInputVariable(name="input1", default=1.0, range=[0, 5])
+    }
+    output_variables = {
+        "output1": ScalarOutputVariable(name="output1"),
+        "output2": ImageOutputVariable(name="output2", axis_labels=["x", "y"]),
+    }
+    codec = VariableCodec(input_variables, output_variables, compact=compact)
+
+    image = np.random.uniform(0, 256, size=(4, 3))
+    encoded = codec.encode(
+        {
+            "input_variables": [input_variables["input1"].copy(update={"value": 2.0})],
+            "output_variables": [
+                output_variables["output1"].copy(update={"value": 3.0}),
+                output_variables["output2"].copy(update={"value": image, "x_max": 2}),
+            ],
+        }
+    )
+    message = codec.decode(pickle.loads(pickle.dumps(encoded)))
+
+    assert [variable.value for variable in message["input_variables"]] == [2.0]
+    scalar, decoded_image = message["output_variables"]
+    assert scalar.value == 3.0
+
+    # compact messages are decoded into the template variables
+    assert (scalar is output_variables["output1"]) == compact
+    assert (decoded_image.value == image).all()
+    assert decoded_image.x_max == 2
+
+    put = codec.decode_put(codec.encode_put("ca", "input1", 4.0, 1.0))
+    assert put == {"protocol": "ca", "pvname": "input1", "value": 4.0, "time": 1.0}
@@ -1,8 +1,9 @@
 import pytest
 import epics
+import time
 from lume_model.variables import ScalarInputVariable
 
-from lume_epics.client.widgets.controls import build_sliders
+from lume_epics.client.widgets.controls import build_sliders, EpicsSlider
 from lume_epics.client.controller import Controller
 
 
@@ -39,3 +40,44 @@ def test_slider_set(value, slider_variables, prefix, sliders):
     for var in slider_variables:
         val = epics.caget(f"{prefix}:{var.name}")
         assert val == value
+
+
+@pytest.mark.parametrize("put_policy", [("rate"), ("coalesce")])
+def test_slider_put_policy(put_policy, model, prefix, controller, server):
+    variable = model.input_variables["input1"]
+    slider = EpicsSlider(prefix, variable, controller, put_policy=put_policy, max_rate=2)
+
+    values = [1.0 + i * 0.1 for i in range(20)]
+    for value in values:
+        slider.bokeh_slider.value = value
+
+    # the final value is put once the rate limit or in flight put allows
+    time.sleep(1.5)
+    assert epics.caget(f"{prefix}:input1") == values[-1]
+    assert slider.suppressed_puts > 0
+
+
+def test_slider_release_put_policy(model, prefix, controller, server):
+    variable = model.input_variables["input1"]
+    slider = EpicsSlider(prefix, variable, controller, put_policy="release")
+
+    values = [1.5, 1.6, 1.7]
+    for value in values:
+        slider.bokeh_slider.value = value
+
+    # nothing is put while dragging
+    assert epics.caget(f"{prefix}:input1") != values[-1]
+
+    slider.bokeh_slider.trigger("value_throttled", None, values[-1])
+    time.sleep(0.5)
+    assert epics.caget(f"{prefix}:input1") == values[-1]
+    assert slider.suppressed_puts == 2
+
+    # a release without a drag suppresses nothing
+    slider.bokeh_slider.trigger("value_throttled", values[-1], values[-1])
+    assert slider.suppressed_puts == 2
+
+
+def test_slider_unknown_put_policy(model, prefix, controller):
+    with pytest.raises(ValueError):
+        EpicsSlider(prefix, model.input_variables["input1"], controller, put_policy="none")
@@ -1,5 +1,7 @@
 import pytest
 
+from bokeh.document import Document
+from bokeh.server.callbacks import PeriodicCallback
 from lume_model.variables import ScalarOutputVariable
 
 from lume_epics.client.widgets.plots import Striptool
@@ -29,3 +31,45 @@ def test_reset_button(striptool, server):
     assert len(initial_val) != len(after_reset)
 
 
+def test_stream_update(striptool, server):
+    striptool.update()
+    n_samples = len(striptool.source.data["y"])
+
+    # new samples are appended to the existing data
+    striptool.update()
+    assert len(striptool.source.data["y"]) == n_samples + 1
+    assert list(striptool.source.data["y"]) == list(
+        striptool.pv_monitors[striptool.live_variable].data
+    )
+
+
+def test_subscribe_sampling(controller, prefix, model, server):
+    output_variables = [var for var in model.output_variables.values() if not var.variable_type == "image"]
+    striptool = Striptool(output_variables, controller, prefix)
+    document = Document()
+
+    def sampling_callbacks():
+        return [
+            callback for callback in document.session_callbacks
+            if isinstance(callback, PeriodicCallback)
+        ]
+
+    striptool.subscribe(document, sampling_period=100)
+    striptool.subscribe(document, sampling_period=100)
+    callbacks = sampling_callbacks()
+    assert len(callbacks) == 1
+    assert callbacks[0].period == 100
+
+    # constant values are still sampled
+    callbacks[0].callback()
+    n_samples = len(striptool.source.data["y"])
+    callbacks[0].callback()
+    assert len(striptool.source.data["y"]) == n_samples + 1
+
+    # sampling follows a new live variable
+    striptool.selection.value = output_variables[1].name
+    assert sampling_callbacks() == callbacks
+
+    striptool.subscribe(document, sampling_period=None)
+    assert not sampling_callbacks()
+    striptool._updater.close()
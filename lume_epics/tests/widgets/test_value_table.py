@@ -1,6 +1,7 @@
 import pytest
 import epics
 import time
+from bokeh.document import Document
 from lume_epics.client.widgets.tables import ValueTable
 
 
@@ -43,3 +44,16 @@ def test_value_table_update(
         val = value_table._source.data["y"][val_idx]
 
         assert epics_val == float(val)
+
+
+def test_value_table_unchanged(value_table, server):
+    value_table.update()
+
+    document = Document()
+    document.add_root(value_table.table)
+    events = []
+    document.on_change(events.append)
+
+    # no patch sent when no value has changed
+    value_table.update()
+    assert not events
@@ -0,0 +1,595 @@
+"""
+The transport module contains utilities for moving variable data between the
+comm thread of lume_epics.epics_server.Server and the Channel Access and pvAccess
+server processes.
+
+Messages are encoded with a VariableCodec before they are queued. Compact codecs
+at both ends build the same variable index from their static variable metadata at
+startup, so only integer indices and values cross the process boundary rather than
+pickled lume-model variables. Otherwise the variables are queued as they are.
+
+Image arrays may be placed in shared memory ring buffers so that only a slot
+reference passes through the multiprocessing queues. A single producer (the comm
+thread) writes each frame once and any number of consumers (the protocol
+processes) copy the frame out of shared memory rather than unpickling it from the
+queue. The producer never waits for consumers, so a consumer discards a frame whose
+slot was rewritten while it was being copied.
+
+"""
+import logging
+import numbers
+from queue import Empty
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from lume_model.variables import InputVariable, OutputVariable
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # python < 3.8
+    shared_memory = None
+
+logger = logging.getLogger(__name__)
+
+# message placed on an output queue to wake its consumer for shutdown
+WAKE_MESSAGE = None
+
+# image metadata sent alongside array values
+ARRAY_ATTRIBUTES = ("x_min", "x_max", "y_min", "y_max")
+
+
+class VariableCodec:
+    """
+    Encodes variable updates as compact queue messages and decodes them back into
+    lume-model variables using locally held templates.
+
+    Variables are indexed by position, inputs first and then outputs, in the order
+    of the dictionaries passed at construction. Encoded output messages hold:
+
+        scalars: Raw buffers of an int32 index array and a float64 value array.
+
+        arrays: List of (index, array, attributes) tuples, with the raw array 
+            buffer and any image extents.
+
+        objects: List of (index, value) tuples for all other values.
+
+        image_slots: Shared memory slot references, passed through unchanged.
+
+    Decoding updates the codec's template variables in place, so decoded 
+    variables reflect the most recently decoded value. Input puts are encoded as 
+    (protocol, index, value, time) tuples.
+
+    Codecs created with compact=False queue copies of the variables and input puts 
+    as dictionaries instead, as messages were passed before the compact encoding.
+
+    """
+
+    def __init__(
+        self,
+        input_variables: Dict[str, InputVariable],
+        output_variables: Dict[str, OutputVariable],
+        compact: bool = True,
+    ) -> None:
+        """Build the variable index.
+
+        Args:
+            input_variables (Dict[str, InputVariable]): Input variables, mapped by 
+                name.
+
+            output_variables (Dict[str, OutputVariable]): Output variables served, 
+                mapped by name.
+
+            compact (bool): Use the compact encoding. Variables are queued as 
+                copies otherwise.
+
+        """
+        self.compact = compact
+        self._templates = list(input_variables.values()) + list(
+            output_variables.values()
+        )
+        self._n_inputs = len(input_variables)
+        self._input_index = {name: i for i, name in enumerate(input_variables)}
+        self._output_index = {
+            name: i + self._n_inputs for i, name in enumerate(output_variables)
+        }
+        self._names = list(input_variables) + list(output_variables)
+
+    def encode(self, message: dict) -> dict:
+        """Encode an output queue message.
+
+        Args:
+            message (dict): Message holding "input_variables", "output_variables" 
+                and/or "image_slots".
+
+        Returns:
+            dict: Encoded message.
+
+        """
+        if not self.compact:
+            # copied, as the queue pickles messages after put returns
+            encoded = {
+                key: [variable.copy() for variable in message[key]]
+                for key in ("input_variables", "output_variables")
+                if message.get(key)
+            }
+
+            if message.get("image_slots"):
+                encoded["image_slots"] = message["image_slots"]
+
+            return encoded
+
+        indices = []
+        values = []
+        arrays = []
+        objects = []
+
+        variables = [
+            (self._input_index[variable.name], variable)
+            for variable in message.get("input_variables", [])
+        ] + [
+            (self._output_index[variable.name], variable)
+            for variable in message.get("output_variables", [])
+        ]
+
+        for index, variable in variables:
+            value = variable.value
+
+            if isinstance(value, numbers.Real) and not isinstance(value, bool):
+                indices.append(index)
+                values.append(value)
+
+            elif isinstance(value, np.ndarray):
+                attributes = {
+                    attribute: getattr(variable, attribute)
+                    for attribute in ARRAY_ATTRIBUTES
+                    if hasattr(variable, attribute)
+                }
+                arrays.append((index, np.ascontiguousarray(value), attributes))
+
+            else:
+                objects.append((index, value))
+
+        encoded = {}
+        if indices:
+            encoded["scalars"] = (
+                np.array(indices, dtype=np.int32).tobytes(),
+                np.array(values, dtype=np.float64).tobytes(),
+            )
+
+        if arrays:
+            encoded["arrays"] = arrays
+
+        if objects:
+            encoded["objects"] = objects
+
+        if message.get("image_slots"):
+            encoded["image_slots"] = message["image_slots"]
+
+        return encoded
+
+    def decode(self, encoded: dict) -> dict:
+        """Decode an encoded output queue message into lume-model variables. 
+        Compact messages are decoded into the codec's template variables, updated 
+        in place, rather than into new variables. The returned variables are 
+        therefore shared with earlier and later decoded messages and hold the most 
+        recently decoded values; copy them to keep the values of one message.
+
+        Args:
+            encoded (dict): Message produced by encode.
+
+        Returns:
+            dict: Message holding "input_variables", "output_variables" and 
+                "image_slots".
+
+        """
+        if not self.compact:
+            return {
+                "input_variables": encoded.get("input_variables", []),
+                "output_variables": encoded.get("output_variables", []),
+                "image_slots": encoded.get("image_slots", []),
+            }
+
+        updates = []
+
+        if "scalars" in encoded:
+            indices, values = encoded["scalars"]
+            updates += [
+                (index, {"value": value})
+                for index, value in zip(
+                    np.frombuffer(indices, dtype=np.int32).tolist(),
+                    np.frombuffer(values, dtype=np.float64).tolist(),
+                )
+            ]
+
+        for index, value, attributes in encoded.get("arrays", []):
+            updates.append((index, {"value": value, **attributes}))
+
+        for index, value in encoded.get("objects", []):
+            updates.append((index, {"value": value}))
+
+        message = {
+            "input_variables": [],
+            "output_variables": [],
+            "image_slots": encoded.get("image_slots", []),
+        }
+
+        for index, update in updates:
+            variable = self._templates[index]
+            for field, value in update.items():
+                setattr(variable, field, value)
+
+            if index < self._n_inputs:
+                message["input_variables"].append(variable)
+
+            else:
+                message["output_variables"].append(variable)
+
+        return message
+
+    def encode_put(
+        self, protocol: str, pvname: str, value: Any, put_time: float
+    ) -> Union[tuple, dict]:
+        """Encode an input put for the input queue.
+
+        Args:
+            protocol (str): Protocol receiving the put.
+
+            pvname (str): Name of the input variable.
+
+            value (Any): Value put.
+
+            put_time (float): Time of the put.
+
+        """
+        if not self.compact:
+            return {
+                "protocol": protocol,
+                "pvname": pvname,
+                "value": value,
+                "time": put_time,
+            }
+
+        return (protocol, self._input_index[pvname], value, put_time)
+
+    def decode_put(self, encoded: Union[tuple, dict]) -> dict:
+        """Decode an input put.
+
+        Args:
+            encoded (Union[tuple, dict]): Put produced by encode_put.
+
+        Returns:
+            dict: Put with "protocol", "pvname", "value" and "time" entries.
+
+        """
+        if not self.compact:
+            return encoded
+
+        protocol, index, value, put_time = encoded
+        return {
+            "protocol": protocol,
+            "pvname": self._names[index],
+            "value": value,
+            "time": put_time,
+        }
+
+
+class SharedImageRing:
+    """
+    Ring of shared memory slots holding frames of a single image variable.
+
+    The buffer starts with one int64 sequence number per slot followed by the slot
+    data. The producer invalidates a slot's sequence number before writing and
+    stamps it afterwards, so consumers can detect frames that have been
+    overwritten by the time they are read.
+
+    Attributes:
+        shape (Tuple[int]): Shape of the image frames.
+
+        dtype (np.dtype): Data type of the image frames.
+
+        n_slots (int): Number of frames held by the ring.
+
+        name (str): Name of the shared memory block.
+
+    """
+
+    def __init__(
+        self,
+        shape: Tuple[int],
+        dtype: np.dtype,
+        n_slots: int = 4,
+        name: str = None,
+    ) -> None:
+        """Create a new shared memory ring, or attach to an existing ring when a
+        name is provided.
+
+        Args:
+            shape (Tuple[int]): Shape of the image frames.
+
+            dtype (np.dtype): Data type of the image frames.
+
+            n_slots (int): Number of frames held by the ring.
+
+            name (str): Name of an existing shared memory block to attach to.
+
+        """
+        if shared_memory is None:
+            raise RuntimeError(
+                "Shared memory image transport requires python >= 3.8."
+            )
+
+        if n_slots < 2:
+            raise ValueError("Shared memory ring requires at least two slots.")
+
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.n_slots = n_slots
+
+        self._header_size = 8 * n_slots
+        self._slot_size = int(np.prod(self.shape)) * self.dtype.itemsize
+        size = self._header_size + self._slot_size * n_slots
+
+        self._owner = name is None
+        self._shm = shared_memory.SharedMemory(
+            name=name, create=self._owner, size=size
+        )
+        self.name = self._shm.name
+        self._seq = 0
+
+        if self._owner:
+            self._header()[:] = -1
+
+    def __reduce__(self):
+        """Attach to the same shared memory block when passed to another process.
+        """
+        return (
+            self.__class__,
+            (self.shape, self.dtype.str, self.n_slots, self.name),
+        )
+
+    def _header(self) -> np.ndarray:
+        return np.ndarray((self.n_slots,), dtype=np.int64, buffer=self._shm.buf)
+
+    def _slot(self, slot: int) -> np.ndarray:
+        return np.ndarray(
+            self.shape,
+            dtype=self.dtype,
+            buffer=self._shm.buf,
+            offset=self._header_size + slot * self._slot_size,
+        )
+
+    def accepts(self, array: np.ndarray) -> bool:
+        """Check whether an array fits the ring.
+
+        Args:
+            array (np.ndarray): Image array to check.
+
+        """
+        return array.shape == self.shape and array.dtype == self.dtype
+
+    def write(self, array: np.ndarray) -> Tuple[int, int]:
+        """Copy a frame into the next slot of the ring.
+
+        Args:
+            array (np.ndarray): Image array to write.
+
+        Returns:
+            Tuple[int, int]: Slot index and sequence number of the frame.
+
+        """
+        self._seq += 1
+        slot = self._seq % self.n_slots
+
+        header = self._header()
+        header[slot] = -1
+        np.copyto(self._slot(slot), array)
+        header[slot] = self._seq
+
+        return slot, self._seq
+
+    def is_current(self, slot: int, seq: int) -> bool:
+        """Check that a slot still holds the frame with the given sequence number.
+
+        Args:
+            slot (int): Slot index.
+
+            seq (int): Sequence number assigned when the frame was written.
+
+        """
+        return int(self._header()[slot]) == seq
+
+    def read(self, slot: int, seq: int) -> Optional[np.ndarray]:
+        """Returns a copy of a frame, or None if the frame has been overwritten by a
+        newer one. The writer does not wait for readers, so the slot is checked again
+        once copied and the copy is discarded if the slot was rewritten meanwhile.
+
+        Args:
+            slot (int): Slot index.
+
+            seq (int): Sequence number assigned when the frame was written.
+
+        """
+        if not self.is_current(slot, seq):
+            return None
+
+        frame = self._slot(slot).copy()
+
+        if not self.is_current(slot, seq):
+            return None
+
+        return frame
+
+    def close(self) -> None:
+        """Close this handle on the shared memory block.
+
+        """
+        try:
+            self._shm.close()
+        except BufferError:
+            # views of the buffer are still referenced, memory is released on exit
+            logger.debug("Shared memory ring %s still in use at close.", self.name)
+
+    def unlink(self) -> None:
+        """Remove the shared memory block. Must only be called by the producer once
+        all consumers have stopped.
+
+        """
+        self._shm.unlink()
+
+
+def write_image_slots(
+    output_variables: List[OutputVariable], image_rings: Dict[str, SharedImageRing]
+) -> Tuple[List[OutputVariable], List[dict]]:
+    """Write image outputs into their shared memory rings.
+
+    Args:
+        output_variables (List[OutputVariable]): Output variables returned by the
+            model.
+
+        image_rings (Dict[str, SharedImageRing]): Maps variable name to ring.
+
+    Returns:
+        Tuple[List[OutputVariable], List[dict]]: Variables that must still be sent
+            through the queue and slot references for the images placed in shared
+            memory.
+
+    """
+    queued = []
+    image_slots = []
+
+    for variable in output_variables:
+        ring = image_rings.get(variable.name)
+
+        if (
+            ring is not None
+            and isinstance(variable.value, np.ndarray)
+            and ring.accepts(variable.value)
+        ):
+            slot, seq = ring.write(variable.value)
+            image_slots.append(
+                {
+                    "name": variable.name,
+                    "slot": slot,
+                    "seq": seq,
+                    "shape": ring.shape,
+                    "dtype": ring.dtype.str,
+                    "x_min": variable.x_min,
+                    "x_max": variable.x_max,
+                    "y_min": variable.y_min,
+                    "y_max": variable.y_max,
+                }
+            )
+
+        else:
+            queued.append(variable)
+
+    return queued, image_slots
+
+
+def read_image_slots(
+    image_slots: List[dict],
+    image_rings: Dict[str, SharedImageRing],
+    output_variables: Dict[str, OutputVariable],
+) -> List[OutputVariable]:
+    """Build output variables holding copies of the frames referenced by slot 
+    messages. Frames overwritten before or while they were copied are skipped, as a 
+    newer frame for the same variable is already queued.
+
+    Args:
+        image_slots (List[dict]): Slot references produced by write_image_slots.
+
+        image_rings (Dict[str, SharedImageRing]): Maps variable name to ring.
+
+        output_variables (Dict[str, OutputVariable]): Output variables served by
+            the process, used as templates for the variable metadata.
+
+    """
+    variables = []
+
+    for image_slot in image_slots:
+        name = image_slot["name"]
+        value = image_rings[name].read(image_slot["slot"], image_slot["seq"])
+
+        if value is None:
+            logger.debug("Skipping overwritten frame for %s.", name)
+            continue
+
+        variables.append(
+            output_variables[name].copy(
+                update={
+                    "value": value,
+                    "x_min": image_slot["x_min"],
+                    "x_max": image_slot["x_max"],
+                    "y_min": image_slot["y_min"],
+                    "y_max": image_slot["y_max"],
+                }
+            )
+        )
+
+    return variables
+
+
+def drain_queue(queue, timeout: float = None) -> list:
+    """Blocks until a message is available, then collects every message already
+    pending on the queue.
+
+    Args:
+        queue (multiprocessing.Queue): Queue to drain.
+
+        timeout (float): Time in seconds to wait for the first message. Waits 
+            indefinitely if not provided.
+
+    Raises:
+        Empty: No message was received before the timeout.
+
+    """
+    messages = [queue.get(timeout=timeout)]
+
+    while True:
+        try:
+            messages.append(queue.get_nowait())
+        except Empty:
+            break
+
+    return messages
+
+
+def merge_messages(messages: List[dict]) -> Tuple[list, list, List[dict]]:
+    """Merges output queue messages so that each variable is applied once, with the
+    value from the most recent message.
+
+    Args:
+        messages (List[dict]): Messages in the order they were queued.
+
+    Returns:
+        Tuple[list, list, List[dict]]: Input variables, output variables and image 
+            slot references to apply.
+
+    """
+    inputs = {}
+    outputs = {}
+
+    for message in messages:
+        if message is WAKE_MESSAGE:
+            continue
+
+        for variable in message.get("input_variables", []):
+            inputs[variable.name] = variable
+
+        for variable in message.get("output_variables", []):
+            outputs[variable.name] = variable
+
+        for image_slot in message.get("image_slots", []):
+            outputs[image_slot["name"]] = image_slot
+
+    output_variables = []
+    image_slots = []
+    for output in outputs.values():
+        if isinstance(output, dict):
+            image_slots.append(output)
+
+        else:
+            output_variables.append(output)
+
+    return list(inputs.values()), output_variables, image_slots
@@ -17,7 +17,7 @@ setup(
     name="lume-epics",
     version=versioneer.get_version(),
     cmdclass=versioneer.get_cmdclass(),
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     author='SLAC National Accelerator Laboratory',
     author_email="jgarra@slac.stanford.edu",
     license="SLAC Open",